@@ -3,13 +3,142 @@ import streamlit as st
 import sqlite3
 from datetime import datetime
 import pandas as pd
-import json
+import numpy as np
 import os
+import threading
 from io import BytesIO
 from contextlib import contextmanager
+from functools import lru_cache
+from collections import namedtuple
+from models.answers import encode_answers, decode_answers
 
 # ==================== Database Manager Class ====================
 
+# Tuning applied once to every persistent SQLite connection
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-64000",
+)
+
+# Hot write statements, kept as constants so every call hands sqlite3 the
+# same SQL text and hits each connection's prepared-statement cache
+_INSERT_CHAPTER_SQL = '''INSERT INTO chapters
+                         (chapter_name, num_questions, num_options, correct_answers)
+                         VALUES (?, ?, ?, ?)'''
+_INSERT_ATTEMPT_SQL = '''INSERT INTO attempts
+                         (chapter_id, student_name, submitted_answers,
+                          score, total_questions, attempt_number)
+                         VALUES (?, ?, ?, ?, ?, ?)'''
+
+_thread_local = threading.local()
+
+# Database files whose schema has already been created in this process
+_initialized_db_paths = set()
+_init_lock = threading.Lock()
+
+# SQLite allows one writer at a time; writers in this process queue on this
+# lock instead of contending for the database lock and retrying on busy
+_write_lock = threading.Lock()
+
+
+def get_conn(db_path: str) -> sqlite3.Connection:
+    """
+    Get the calling thread's persistent connection to a database
+
+    Streamlit runs every rerun of the script on a fresh thread, so the
+    connection lasts for one run: all queries in that run share it instead
+    of reopening the file and reapplying the pragmas each time, and it is
+    closed when the thread exits. Pages survive between runs in the OS
+    cache and the mmap region, not in SQLite's per-connection cache.
+
+    Args:
+        db_path: Path to the SQLite database file
+
+    Returns:
+        Open sqlite3.Connection with row_factory set to sqlite3.Row
+    """
+    connections = getattr(_thread_local, 'connections', None)
+    if connections is None:
+        connections = _thread_local.connections = {}
+
+    conn = connections.get(db_path)
+    if conn is None:
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        connections[db_path] = conn
+    return conn
+
+
+# A chapters row; picklable, so it can be returned from st.cache_data loaders
+ChapterRow = namedtuple(
+    'ChapterRow', 'id chapter_name num_questions num_options correct_answers created_at')
+
+
+@lru_cache(maxsize=256)
+def decode_answer_key(stored_correct: str) -> tuple:
+    """
+    Decode a chapter's stored correct answers once per distinct value
+
+    Args:
+        stored_correct: Value of the chapter's correct_answers column
+
+    Returns:
+        Tuple of option letters
+    """
+    return tuple(decode_answers(stored_correct))
+
+
+@lru_cache(maxsize=256)
+def decode_answer_arrays(stored_submitted: str, stored_correct: str) -> tuple:
+    """
+    Decode an attempt's stored answers once and reuse them across reruns
+
+    Args:
+        stored_submitted: Value of the attempt's submitted_answers column
+        stored_correct: Value of the chapter's correct_answers column
+
+    Returns:
+        Tuple of read-only object arrays (submitted, correct)
+    """
+    arrays = (np.asarray(decode_answers(stored_submitted), dtype=object),
+              np.asarray(decode_answers(stored_correct), dtype=object))
+    for arr in arrays:
+        arr.flags.writeable = False  # Shared between reruns and sessions
+    return arrays
+
+
+def compare_answers(stored_submitted: str, stored_correct: str) -> tuple:
+    """
+    Compare two stored answer strings question by question
+
+    Packed strings are compared as raw bytes, so the mask is built by a single
+    native NumPy comparison however many questions the exam has. Legacy JSON
+    rows fall back to the decoded object arrays. If the two lengths differ,
+    only the questions both have are compared, as zip() would.
+
+    Args:
+        stored_submitted: Value of the attempt's submitted_answers column
+        stored_correct: Value of the chapter's correct_answers column
+
+    Returns:
+        Tuple of (correct mask, correct count, wrong count)
+    """
+    if stored_submitted.startswith('[') or stored_correct.startswith('['):
+        submitted, correct = decode_answer_arrays(stored_submitted, stored_correct)
+        n = min(len(submitted), len(correct))
+        mask = submitted[:n] == correct[:n]
+    else:
+        n = min(len(stored_submitted), len(stored_correct))
+        mask = (np.frombuffer(stored_submitted[:n].encode('ascii'), dtype=np.uint8) ==
+                np.frombuffer(stored_correct[:n].encode('ascii'), dtype=np.uint8))
+    n_correct = int(np.count_nonzero(mask))
+    return mask, n_correct, len(mask) - n_correct
+
 
 class DatabaseManager:
     """Handles all SQLite database operations with OOP principles"""
@@ -17,17 +146,34 @@ class DatabaseManager:
     def __init__(self, db_path: str = 'omr_data.db'):
         """Initialize database manager with database path"""
         self.db_path = db_path
-        self.init_db()
+        # Streamlit rebuilds the manager on every rerun, so only run the
+        # schema DDL the first time a database file is seen
+        with _init_lock:
+            if db_path not in _initialized_db_paths:
+                self.init_db()
+                _initialized_db_paths.add(db_path)
     
     @contextmanager
     def _get_connection(self):
-        """Context manager for database connections"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+        """Context manager yielding this thread's persistent connection"""
+        conn = get_conn(self.db_path)
         try:
             yield conn
-        finally:
-            conn.close()
+        except Exception:
+            # The connection outlives this block, so never leave a
+            # half-finished transaction behind on it
+            conn.rollback()
+            raise
+    
+    @contextmanager
+    def _get_write_connection(self):
+        """
+        Context manager yielding this thread's connection as the sole writer,
+        inside a transaction that already holds SQLite's write lock
+        """
+        with _write_lock, self._get_connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            yield conn
     
     def init_db(self):
         """Initialize the SQLite database with required tables"""
@@ -54,7 +200,73 @@ class DatabaseManager:
                           attempt_number INTEGER NOT NULL,
                           submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                           FOREIGN KEY (chapter_id) REFERENCES chapters(id))''')
-            
+
+            # Indexes for per-student counts and newest-first attempt lists.
+            # The layered package shares this file and creates indexes named
+            # idx_attempts_chapter_student and idx_attempts_submitted_at with
+            # other definitions, so the ones that differ get their own names
+            c.execute('''CREATE INDEX IF NOT EXISTS idx_attempts_chapter_student_nocase
+                         ON attempts(chapter_id, student_name COLLATE NOCASE, submitted_at DESC)''')
+            c.execute('''CREATE INDEX IF NOT EXISTS idx_attempts_chapter
+                         ON attempts(chapter_id, submitted_at DESC)''')
+            # Overall history reads newest first by scanning this backwards;
+            # the rowid it carries keeps equal timestamps in id order
+            c.execute('''CREATE INDEX IF NOT EXISTS idx_attempts_submitted_at_id
+                         ON attempts(submitted_at)''')
+            # Covers the per-student GROUP BY, so it never reads the table
+            c.execute('''CREATE INDEX IF NOT EXISTS idx_attempts_student
+                         ON attempts(student_name, score, total_questions)''')
+
+            # Per-chapter running totals, kept current by triggers so chapter
+            # statistics never have to scan the attempts table. Files created
+            # by web_app.py key chapters on chapter_id and are left alone.
+            chapter_columns = {row[1] for row in c.execute('PRAGMA table_info(chapters)')}
+            has_chapter_stats = c.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'chapter_stats'"
+            ).fetchone()
+            if 'id' in chapter_columns and not has_chapter_stats:
+                # The table, its triggers and the one-off backfill land
+                # together, or not at all
+                c.execute('BEGIN IMMEDIATE')
+                c.execute('''CREATE TABLE IF NOT EXISTS chapter_stats
+                             (chapter_id INTEGER PRIMARY KEY,
+                              total_attempts INTEGER NOT NULL DEFAULT 0,
+                              sum_score REAL NOT NULL DEFAULT 0,
+                              sum_total INTEGER NOT NULL DEFAULT 0,
+                              unique_students INTEGER NOT NULL DEFAULT 0,
+                              FOREIGN KEY (chapter_id) REFERENCES chapters(id))''')
+                c.execute('''CREATE TRIGGER IF NOT EXISTS trg_chapter_stats_chapter
+                             AFTER INSERT ON chapters
+                             BEGIN
+                                 INSERT OR IGNORE INTO chapter_stats (chapter_id) VALUES (NEW.id);
+                             END''')
+                # A student counts once per chapter: on their first attempt
+                # there, with names matched case-insensitively as attempts
+                # are numbered
+                c.execute('''CREATE TRIGGER IF NOT EXISTS trg_chapter_stats_attempt
+                             AFTER INSERT ON attempts
+                             BEGIN
+                                 INSERT INTO chapter_stats
+                                     (chapter_id, total_attempts, sum_score, sum_total, unique_students)
+                                 VALUES (NEW.chapter_id, 1, NEW.score, NEW.total_questions, 1)
+                                 ON CONFLICT (chapter_id) DO UPDATE SET
+                                     total_attempts = total_attempts + 1,
+                                     sum_score = sum_score + NEW.score,
+                                     sum_total = sum_total + NEW.total_questions,
+                                     unique_students = unique_students +
+                                         ((SELECT COUNT(*) FROM attempts
+                                           WHERE chapter_id = NEW.chapter_id
+                                             AND student_name = NEW.student_name COLLATE NOCASE) = 1);
+                             END''')
+                # Backfill chapters that predate the summary table
+                c.execute('''INSERT OR IGNORE INTO chapter_stats
+                             SELECT c.id, COUNT(a.id), COALESCE(SUM(a.score), 0),
+                                    COALESCE(SUM(a.total_questions), 0),
+                                    COUNT(DISTINCT a.student_name COLLATE NOCASE)
+                             FROM chapters c
+                             LEFT JOIN attempts a ON c.id = a.chapter_id
+                             GROUP BY c.id''')
+
             conn.commit()
     
     def save_chapter(self, chapter_name: str, num_questions: int, 
@@ -71,45 +283,109 @@ class DatabaseManager:
         Returns:
             Tuple of (success: bool, message: str)
         """
+        return self.save_chapters_bulk([
+            (chapter_name, num_questions, num_options, correct_answers)
+        ])
+    
+    def save_chapters_bulk(self, rows: list) -> tuple:
+        """
+        Save many chapters in a single transaction (one commit for the batch)
+        
+        Args:
+            rows: List of (chapter_name, num_questions, num_options,
+                  correct_answers) tuples
+            
+        Returns:
+            Tuple of (success: bool, message: str); none are saved on failure
+        """
         try:
-            with self._get_connection() as conn:
+            with self._get_write_connection() as conn:
                 c = conn.cursor()
-                c.execute('''INSERT INTO chapters 
-                             (chapter_name, num_questions, num_options, correct_answers)
-                             VALUES (?, ?, ?, ?)''',
-                          (chapter_name, num_questions, num_options, json.dumps(correct_answers)))
+                c.executemany(_INSERT_CHAPTER_SQL,
+                              [(chapter_name, num_questions, num_options,
+                                encode_answers(correct_answers))
+                               for (chapter_name, num_questions, num_options,
+                                    correct_answers) in rows])
                 conn.commit()
+            self._load_all_chapters.clear()
+            self._load_chapter_names.clear()
+            self._load_chapter_by_name.clear()
+            self._load_chapter_statistics.clear()
+            if len(rows) == 1:
                 return True, "Chapter saved successfully!"
+            return True, f"{len(rows)} chapters saved successfully!"
         except sqlite3.IntegrityError:
             return False, "Chapter already exists!"
         except Exception as e:
             return False, f"Error: {str(e)}"
     
     def get_all_chapters(self) -> pd.DataFrame:
-        """Retrieve all chapters from database"""
-        with self._get_connection() as conn:
-            df = pd.read_sql_query("SELECT * FROM chapters ORDER BY created_at DESC", conn)
-            return df
+        """Retrieve all chapters, without answer keys (cached until a chapter is saved)"""
+        return self._load_all_chapters(self.db_path)
+    
+    def get_chapter_names(self) -> tuple:
+        """Get chapter names, newest first, for the chapter pickers (cached until a chapter is saved)"""
+        return self._load_chapter_names(self.db_path)
     
-    def get_chapter_by_name(self, chapter_name: str) -> tuple:
+    def get_chapter_by_name(self, chapter_name: str) -> ChapterRow:
         """
-        Get chapter details by name
+        Get chapter details by name (cached until a chapter is saved)
         
         Args:
             chapter_name: Name of the chapter to retrieve
             
         Returns:
-            Tuple of chapter data or None if not found
+            ChapterRow of chapter data or None if not found
         """
-        with self._get_connection() as conn:
-            c = conn.cursor()
-            c.execute("SELECT * FROM chapters WHERE chapter_name = ?", (chapter_name,))
-            result = c.fetchone()
-            return tuple(result) if result else None
+        return self._load_chapter_by_name(self.db_path, chapter_name)
+    
+    @staticmethod
+    @st.cache_data(ttl=300, show_spinner=False)
+    def _load_all_chapters(db_path: str) -> pd.DataFrame:
+        """Query all chapters except their answer keys, cached per database path"""
+        return pd.read_sql_query(
+            '''SELECT id, chapter_name, num_questions, num_options, created_at
+               FROM chapters ORDER BY created_at DESC''', get_conn(db_path))
+    
+    @staticmethod
+    @st.cache_data(ttl=300, show_spinner=False)
+    def _load_chapter_names(db_path: str) -> tuple:
+        """Query just the chapter names, cached per database path across reruns"""
+        rows = get_conn(db_path).execute(
+            "SELECT chapter_name FROM chapters ORDER BY created_at DESC").fetchall()
+        return tuple(name for (name,) in rows)
+    
+    @staticmethod
+    @st.cache_data(ttl=300, show_spinner=False)
+    def _load_chapter_by_name(db_path: str, chapter_name: str) -> ChapterRow:
+        """Query a single chapter, cached per database path and name"""
+        c = get_conn(db_path).cursor()
+        c.execute(f"SELECT {', '.join(ChapterRow._fields)} FROM chapters "
+                  "WHERE chapter_name = ?", (chapter_name,))
+        result = c.fetchone()
+        return ChapterRow(*result) if result else None
+    
+    # Compact dtypes for attempt frames; names repeat a lot. Numeric columns
+    # stay at full width so the derived percentages carry no rounding error
+    ATTEMPT_DTYPES = {
+        'student_name': 'category',
+        'chapter_name': 'category',
+    }
+    
+    @staticmethod
+    def _prepare_attempts(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Shrink an attempts frame read from SQLite to compact dtypes and
+        attach each attempt's percentage, so pages never recompute it
+        """
+        df = df.astype(DatabaseManager.ATTEMPT_DTYPES)
+        df['percentage'] = df['score'].to_numpy() / df['total_questions'].to_numpy() * 100
+        return df
     
     def get_attempt_count(self, chapter_id: int, student_name: str) -> int:
         """
         Get the number of attempts for a student on a specific chapter
+        (cached until an attempt is saved)
         
         Args:
             chapter_id: ID of the chapter
@@ -118,13 +394,18 @@ class DatabaseManager:
         Returns:
             Count of attempts
         """
-        with self._get_connection() as conn:
-            c = conn.cursor()
-            c.execute('''SELECT COUNT(*) FROM attempts
-                         WHERE chapter_id = ? AND student_name = ?''',
-                      (chapter_id, student_name))
-            count = c.fetchone()[0]
-            return count
+        return self._load_attempt_count(self.db_path, chapter_id, student_name)
+    
+    @staticmethod
+    @st.cache_data(ttl=300, show_spinner=False)
+    def _load_attempt_count(db_path: str, chapter_id: int, student_name: str) -> int:
+        """Count a student's attempts on a chapter, cached per database path"""
+        c = get_conn(db_path).cursor()
+        # Names match case-insensitively, as in get_student_attempts
+        c.execute('''SELECT COUNT(*) FROM attempts
+                     WHERE chapter_id = ? AND student_name = ? COLLATE NOCASE''',
+                  (chapter_id, student_name))
+        return c.fetchone()[0]
     
     def save_attempt(self, chapter_id: int, student_name: str, 
                      submitted_answers: list, score: float, 
@@ -143,146 +424,413 @@ class DatabaseManager:
         Returns:
             True if successful, False otherwise
         """
+        return self.save_attempts_bulk([
+            (chapter_id, student_name, submitted_answers,
+             score, total_questions, attempt_number)
+        ])
+    
+    def save_attempt_with_count(self, chapter_id: int, student_name: str,
+                                submitted_answers: list, score: float,
+                                total_questions: int) -> int:
+        """
+        Save a student's exam attempt as their next attempt, counting earlier
+        attempts and inserting in the same transaction
+        
+        Args:
+            chapter_id: ID of the chapter
+            student_name: Name of the student
+            submitted_answers: List of submitted answers
+            score: Score obtained
+            total_questions: Total number of questions
+            
+        Returns:
+            Attempt number that was saved, or None if the save failed
+        """
         try:
-            with self._get_connection() as conn:
-                c = conn.cursor()
-                c.execute('''INSERT INTO attempts
-                             (chapter_id, student_name, submitted_answers,
-                              score, total_questions, attempt_number)
-                             VALUES (?, ?, ?, ?, ?, ?)''',
-                          (chapter_id, student_name, json.dumps(submitted_answers), 
-                           score, total_questions, attempt_number))
+            with self._get_write_connection() as conn:
+                attempt_number = conn.execute(
+                    'SELECT COUNT(*) FROM attempts '
+                    'WHERE chapter_id = ? AND student_name = ? COLLATE NOCASE',
+                    (chapter_id, student_name)).fetchone()[0] + 1
+                conn.execute(_INSERT_ATTEMPT_SQL,
+                             (chapter_id, student_name, encode_answers(submitted_answers),
+                              score, total_questions, attempt_number))
                 conn.commit()
-                return True
+            self._clear_attempt_caches()
+            return attempt_number
         except Exception as e:
             print(f"Error saving attempt: {str(e)}")
+            return None
+    
+    def save_attempts_bulk(self, rows: list) -> bool:
+        """
+        Save many exam attempts in a single transaction
+        
+        Args:
+            rows: List of (chapter_id, student_name, submitted_answers,
+                  score, total_questions, attempt_number) tuples
+            
+        Returns:
+            True if all rows were saved, False otherwise (none are saved)
+        """
+        try:
+            with self._get_write_connection() as conn:
+                c = conn.cursor()
+                c.executemany(_INSERT_ATTEMPT_SQL,
+                              [(chapter_id, student_name, encode_answers(submitted_answers),
+                                score, total_questions, attempt_number)
+                               for (chapter_id, student_name, submitted_answers,
+                                    score, total_questions, attempt_number) in rows])
+                conn.commit()
+            self._clear_attempt_caches()
+            return True
+        except Exception as e:
+            print(f"Error saving attempts: {str(e)}")
             return False
     
+    def _clear_attempt_caches(self):
+        """Drop cached reads that depend on the attempts table"""
+        self._load_attempt_count.clear()
+        self._load_student_attempts.clear()
+        self._load_student_statistics.clear()
+        self._load_chapter_statistics.clear()
+    
     def get_student_attempts(self, chapter_name: str, student_name: str = None) -> pd.DataFrame:
         """
         Get all attempts for a chapter, optionally filtered by student
+        (cached until an attempt is saved)
         
         Args:
             chapter_name: Name of the chapter
-            student_name: Optional filter by student name
+            student_name: Optional filter by student name (case-insensitive)
             
         Returns:
             DataFrame of attempts
         """
+        return self._load_student_attempts(self.db_path, chapter_name, student_name)
+    
+    @staticmethod
+    @st.cache_data(ttl=300, show_spinner=False)
+    def _load_student_attempts(db_path: str, chapter_name: str,
+                               student_name: str = None) -> pd.DataFrame:
+        """Query a chapter's attempts, cached per database path and filter"""
+        # One statement for both cases, so the connection caches a single plan
+        query = '''SELECT a.*, c.chapter_name
+                   FROM attempts a
+                   JOIN chapters c ON a.chapter_id = c.id
+                   WHERE c.chapter_name = ?
+                     AND (? IS NULL OR a.student_name = ? COLLATE NOCASE)
+                   ORDER BY a.submitted_at DESC'''
+        student_name = student_name or None
+        return DatabaseManager._prepare_attempts(pd.read_sql_query(
+            query, get_conn(db_path), params=(chapter_name, student_name, student_name)))
+    
+    def get_attempts_version(self) -> tuple:
+        """
+        Get a cheap token that changes whenever attempts are added
+        
+        Returns:
+            Tuple of (attempt count, highest attempt id)
+        """
         with self._get_connection() as conn:
-            if student_name:
-                query = '''SELECT a.*, c.chapter_name
-                           FROM attempts a
-                           JOIN chapters c ON a.chapter_id = c.id
-                           WHERE c.chapter_name = ? AND a.student_name = ?
-                           ORDER BY a.submitted_at DESC'''
-                df = pd.read_sql_query(query, conn, params=(chapter_name, student_name))
-            else:
-                query = '''SELECT a.*, c.chapter_name
-                           FROM attempts a
-                           JOIN chapters c ON a.chapter_id = c.id
-                           WHERE c.chapter_name = ?
-                           ORDER BY a.submitted_at DESC'''
-                df = pd.read_sql_query(query, conn, params=(chapter_name,))
+            return tuple(conn.execute('SELECT COUNT(*), MAX(id) FROM attempts').fetchone())
+    
+    def get_all_attempts(self, version: tuple = None) -> pd.DataFrame:
+        """
+        Get all attempts across all chapters, newest first (cached until attempts change)
+        
+        Args:
+            version: Token from get_attempts_version(), looked up if omitted
             
-            return df
+        Returns:
+            DataFrame of attempts joined with their chapter name
+        """
+        if version is None:
+            version = self.get_attempts_version()
+        return self._load_all_attempts(self.db_path, version)
     
-    def get_all_attempts(self) -> pd.DataFrame:
-        """Get all attempts across all chapters"""
-        with self._get_connection() as conn:
-            query = '''SELECT a.*, c.chapter_name 
-                       FROM attempts a
-                       JOIN chapters c ON a.chapter_id = c.id
-                       ORDER BY a.submitted_at DESC'''
-            df = pd.read_sql_query(query, conn)
-            return df
+    @staticmethod
+    @st.cache_data(ttl=300, show_spinner=False)
+    def _load_all_attempts(db_path: str, version: tuple) -> pd.DataFrame:
+        """Query every attempt, cached per database path and attempts version"""
+        # Read in idx_attempts_submitted_at_id order; the id keeps equal
+        # timestamps in a stable order
+        query = '''SELECT a.*, c.chapter_name 
+                   FROM attempts a
+                   JOIN chapters c ON a.chapter_id = c.id
+                   ORDER BY a.submitted_at DESC, a.id DESC'''
+        return DatabaseManager._prepare_attempts(
+            pd.read_sql_query(query, get_conn(db_path)))
+    
+    def get_overall_statistics(self, version: tuple = None) -> dict:
+        """
+        Get headline totals across all attempts without loading them
+        (cached until attempts change)
+        
+        Args:
+            version: Token from get_attempts_version(), looked up if omitted
+            
+        Returns:
+            Dictionary with total_attempts, unique_students and avg_percentage
+        """
+        if version is None:
+            version = self.get_attempts_version()
+        return self._load_overall_statistics(self.db_path, version)
+    
+    @staticmethod
+    @st.cache_data(ttl=300, show_spinner=False)
+    def _load_overall_statistics(db_path: str, version: tuple) -> dict:
+        """Aggregate every attempt in SQL, cached per database path and attempts version"""
+        total_attempts, unique_students, avg_percentage = get_conn(db_path).execute(
+            '''SELECT COUNT(*), COUNT(DISTINCT student_name),
+                      AVG(score * 100.0 / total_questions)
+               FROM attempts''').fetchone()
+        return {
+            'total_attempts': total_attempts,
+            'unique_students': unique_students,
+            'avg_percentage': avg_percentage,
+        }
+    
+    def get_performance_tables(self, version: tuple = None) -> tuple:
+        """
+        Get the chapter-wise and top-student tables for the analytics page
+        (cached until attempts change)
+        
+        Args:
+            version: Token from get_attempts_version(), looked up if omitted
+            
+        Returns:
+            Tuple of (chapter_stats, student_stats) DataFrames
+        """
+        if version is None:
+            version = self.get_attempts_version()
+        return self._load_performance_tables(self.db_path, version)
+    
+    @staticmethod
+    @st.cache_data(ttl=300, show_spinner=False)
+    def _load_performance_tables(db_path: str, version: tuple) -> tuple:
+        """Aggregate attempts per chapter and per student inside SQLite"""
+        conn = get_conn(db_path)
+        chapter_stats = pd.read_sql_query(
+            '''SELECT c.chapter_name AS "Chapter",
+                      COUNT(*) AS "Total Attempts",
+                      AVG(a.score) AS "Avg Score",
+                      MAX(a.total_questions) AS "Total Questions",
+                      COUNT(DISTINCT a.student_name) AS "Unique Students",
+                      ROUND(AVG(a.score) * 100.0 / MAX(a.total_questions), 2)
+                          AS "Avg Percentage"
+               FROM attempts a
+               JOIN chapters c ON a.chapter_id = c.id
+               GROUP BY c.chapter_name
+               ORDER BY c.chapter_name''', conn)
+
+        student_stats = pd.read_sql_query(
+            '''SELECT student_name AS "Student",
+                      COUNT(*) AS "Total Attempts",
+                      SUM(score) AS "Total Score",
+                      SUM(total_questions) AS "Total Questions",
+                      ROUND(SUM(score) * 100.0 / SUM(total_questions), 2) AS "Percentage"
+               FROM attempts
+               GROUP BY student_name
+               ORDER BY SUM(score) * 1.0 / SUM(total_questions) DESC
+               LIMIT 10''', conn)
+
+        return chapter_stats, student_stats
     
     def get_student_statistics(self) -> pd.DataFrame:
-        """Get aggregated statistics for all students"""
-        with self._get_connection() as conn:
-            query = '''SELECT student_name, COUNT(id) as total_attempts,
-                              SUM(score) as total_score, SUM(total_questions) as total_questions
-                       FROM attempts
-                       GROUP BY student_name
-                       ORDER BY total_score DESC'''
-            df = pd.read_sql_query(query, conn)
-            return df
+        """Get aggregated statistics for all students (cached until an attempt is saved)"""
+        return self._load_student_statistics(self.db_path)
+    
+    @staticmethod
+    @st.cache_data(ttl=300, show_spinner=False)
+    def _load_student_statistics(db_path: str) -> pd.DataFrame:
+        """Aggregate attempts per student, cached per database path"""
+        query = '''SELECT student_name, COUNT(id) as total_attempts,
+                          SUM(score) as total_score, SUM(total_questions) as total_questions,
+                          SUM(score) * 1.0 / NULLIF(SUM(total_questions), 0) as accuracy,
+                          RANK() OVER (ORDER BY SUM(score) DESC) as rank
+                   FROM attempts
+                   GROUP BY student_name
+                   ORDER BY total_score DESC'''
+        return pd.read_sql_query(query, get_conn(db_path))
     
     def get_chapter_statistics(self) -> pd.DataFrame:
-        """Get aggregated statistics for all chapters"""
-        with self._get_connection() as conn:
-            query = '''SELECT c.chapter_name, COUNT(a.id) as total_attempts,
-                              AVG(a.score) as avg_score, AVG(a.total_questions) as avg_total,
-                              COUNT(DISTINCT a.student_name) as unique_students
-                       FROM chapters c
-                       LEFT JOIN attempts a ON c.id = a.chapter_id
-                       GROUP BY c.id
-                       ORDER BY total_attempts DESC'''
-            df = pd.read_sql_query(query, conn)
-            return df
+        """Get aggregated statistics for all chapters (cached until data is saved)"""
+        return self._load_chapter_statistics(self.db_path)
+    
+    @staticmethod
+    @st.cache_data(ttl=300, show_spinner=False)
+    def _load_chapter_statistics(db_path: str) -> pd.DataFrame:
+        """Read the per-chapter running totals, cached per database path"""
+        query = '''SELECT c.chapter_name, s.total_attempts,
+                          s.sum_score / NULLIF(s.total_attempts, 0) as avg_score,
+                          s.sum_total * 1.0 / NULLIF(s.total_attempts, 0) as avg_total,
+                          s.unique_students
+                   FROM chapters c
+                   JOIN chapter_stats s ON s.chapter_id = c.id
+                   ORDER BY s.total_attempts DESC'''
+        return pd.read_sql_query(query, get_conn(db_path))
+
+
+@st.cache_resource(show_spinner=False)
+def get_database_manager(db_path: str = 'omr_data.db') -> DatabaseManager:
+    """
+    Get the process-wide DatabaseManager for a database file
+
+    The manager holds no connection itself (each thread uses its own from
+    get_conn), so one instance can safely serve every session.
+
+    Args:
+        db_path: Path to the SQLite database file
+
+    Returns:
+        DatabaseManager for db_path
+    """
+    return DatabaseManager(db_path)
 
 
 # ==================== Helper Functions ====================
 
-def get_option_letters(num_options: int) -> list:
-    """Get list of option letters based on number of options"""
-    return [chr(65 + i) for i in range(num_options)]  # A, B, C, D, E, F
+@lru_cache(maxsize=16)
+def get_option_letters(num_options: int) -> tuple:
+    """Get tuple of option letters based on number of options"""
+    return tuple(chr(65 + i) for i in range(num_options))  # A, B, C, D, E, F
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def build_comparison_table(stored_submitted: str, stored_correct: str,
+                           filter_option: str) -> tuple:
+    """
+    Build the results page comparison table for one attempt and filter
+
+    Args:
+        stored_submitted: Value of the attempt's submitted_answers column
+        stored_correct: Value of the chapter's correct_answers column
+        filter_option: "All", "Correct" or "Incorrect"
+
+    Returns:
+        Tuple of (filtered DataFrame, total questions)
+    """
+    sub, cor = decode_answer_arrays(stored_submitted, stored_correct)
+    is_correct = compare_answers(stored_submitted, stored_correct)[0]
+    df_comparison = pd.DataFrame({
+        "Question": np.char.add("Q.", np.arange(1, len(sub) + 1).astype(str)),
+        "Student Answer": sub,
+        "Correct Answer": cor,
+        "Status": np.where(is_correct, "✅ Correct", "❌ Wrong")
+    })
+
+    # Apply filter with the correctness mask, no copies needed
+    if filter_option == "Correct":
+        df_display = df_comparison.loc[is_correct]
+    elif filter_option == "Incorrect":
+        df_display = df_comparison.loc[~is_correct]
+    else:
+        df_display = df_comparison
+
+    return df_display, len(df_comparison)
+
+
+def render_metric_cards(cards: list):
+    """
+    Render a row of metric cards with a single markdown call
+
+    Args:
+        cards: List of (value, label) pairs, one per card
+    """
+    html = "".join(
+        f'<div class="metric-card"><div class="metric-value">{value}</div>'
+        f'<div class="metric-label">{label}</div></div>'
+        for value, label in cards)
+    st.markdown(
+        f'<div style="display: grid; grid-template-columns: repeat({len(cards)}, 1fr); '
+        f'gap: 1rem;">{html}</div>', unsafe_allow_html=True)
 
 
 def calculate_score(correct_answers: list, submitted_answers: list) -> int:
     """Calculate score based on correct and submitted answers"""
-    correct_count = 0
-    for correct, submitted in zip(correct_answers, submitted_answers):
-        if correct == submitted:
-            correct_count += 1
-    return correct_count
+    # Compare only the overlapping prefix, as zip() did
+    n = min(len(correct_answers), len(submitted_answers))
+    correct = np.asarray(correct_answers[:n], dtype=object)
+    submitted = np.asarray(submitted_answers[:n], dtype=object)
+    return int((correct == submitted).sum())
+
+
+# Cell formats used by the Excel report, registered once per workbook
+_FORMAT_SPECS = {
+    'header': {
+        'bold': True,
+        'bg_color': '#0d6efd',
+        'font_color': 'white',
+        'border': 1,
+        'align': 'center',
+        'valign': 'vcenter'
+    },
+    'correct': {'bg_color': '#d4edda', 'border': 1},
+    'incorrect': {'bg_color': '#f8d7da', 'border': 1},
+    'summary': {'bold': True, 'border': 1},
+    'cell': {'border': 1, 'align': 'center'},
+}
+
+
+def _get_formats(workbook):
+    """Register every report format on a workbook and return them by name"""
+    return {name: workbook.add_format(spec) for name, spec in _FORMAT_SPECS.items()}
+
+
+def _write_table(sheet, columns, header_format, cell_format):
+    """Write a {header: values} table to a worksheet, one row per call"""
+    sheet.write_row(0, 0, list(columns), header_format)
+    values = [col.tolist() if isinstance(col, np.ndarray) else col
+              for col in columns.values()]
+    for row_num, row in enumerate(zip(*values), start=1):
+        sheet.write_row(row_num, 0, row, cell_format)
+
+
+def _highlight_column(sheet, col, num_rows, match_value,
+                      correct_format, incorrect_format):
+    """Colour a data column by whether each cell equals match_value"""
+    sheet.conditional_format(1, col, num_rows, col, {
+        'type': 'cell', 'criteria': '==', 'value': match_value,
+        'format': correct_format
+    })
+    sheet.conditional_format(1, col, num_rows, col, {
+        'type': 'cell', 'criteria': '!=', 'value': match_value,
+        'format': incorrect_format
+    })
 
 
 def create_excel_download(student_name, chapter_name, score, total_questions,
                           percentage, attempt_number, submitted_answers,
-                          correct_answers, submitted_at=None):
-    """Create Excel file with exam details and answer comparison"""
+                          correct_answers, submitted_at=None,
+                          constant_memory=False):
+    """
+    Create Excel file with exam details and answer comparison
+
+    Every sheet is written strictly top to bottom, so constant_memory=True
+    lets xlsxwriter flush each row as it goes instead of keeping the whole
+    workbook in memory; worth it for very long tests.
+    """
+
+    # Per-question comparison shared by the answer and detail sheets
+    sub = np.asarray(submitted_answers, dtype=object)
+    cor = np.asarray(correct_answers, dtype=object)
+    is_correct = sub == cor
+    unanswered = pd.isna(sub)
+    question_numbers = np.arange(1, len(sub) + 1)
+    # Shown on both the summary and analysis sheets
+    percentage_text = f"{percentage:.2f}%"
 
     # Create a BytesIO buffer for the Excel file
     output = BytesIO()
 
-    # Create Excel writer
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        workbook = writer.book
-
-        # Format for headers
-        header_format = workbook.add_format({
-            'bold': True,
-            'bg_color': '#0d6efd',
-            'font_color': 'white',
-            'border': 1,
-            'align': 'center',
-            'valign': 'vcenter'
-        })
-
-        # Format for correct answers
-        correct_format = workbook.add_format({
-            'bg_color': '#d4edda',
-            'border': 1
-        })
-
-        # Format for incorrect answers
-        incorrect_format = workbook.add_format({
-            'bg_color': '#f8d7da',
-            'border': 1
-        })
-
-        # Format for summary
-        summary_format = workbook.add_format({
-            'bold': True,
-            'border': 1
-        })
-
-        # Format for general cells
-        cell_format = workbook.add_format({
-            'border': 1,
-            'align': 'center'
-        })
+    # Imported here so app start-up does not pay for it until a report is built
+    import xlsxwriter
+
+    # Create Excel workbook
+    options = {'constant_memory': True} if constant_memory else {'in_memory': True}
+    with xlsxwriter.Workbook(output, options) as workbook:
+        formats = _get_formats(workbook)
 
         # ========== Sheet 1: Exam Summary ==========
         summary_data = {
@@ -301,81 +849,43 @@ def create_excel_download(student_name, chapter_name, score, total_questions,
                 submitted_at if submitted_at else datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 f"{score}/{total_questions}",
                 total_questions,
-                f"{percentage:.2f}%",
+                percentage_text,
                 attempt_number
             ]
         }
 
-        summary_df = pd.DataFrame(summary_data)
-        summary_df.to_excel(writer, sheet_name='Exam Summary', index=False)
-
-        summary_sheet = writer.sheets['Exam Summary']
+        summary_sheet = workbook.add_worksheet('Exam Summary')
         summary_sheet.set_column('A:A', 20)
         summary_sheet.set_column('B:B', 30)
-
-        # Apply formatting to header
-        for col_num, value in enumerate(summary_df.columns.values):
-            summary_sheet.write(0, col_num, value, header_format)
-
-        # Apply formatting to data
-        for row_num in range(1, len(summary_df) + 1):
-            for col_num in range(len(summary_df.columns)):
-                summary_sheet.write(row_num, col_num,
-                                    summary_df.iloc[row_num-1, col_num],
-                                    cell_format)
+        _write_table(summary_sheet, summary_data, formats['header'], formats['cell'])
 
         # ========== Sheet 2: Answer Comparison ==========
-        comparison_data = []
-        for i in range(len(submitted_answers)):
-            is_correct = submitted_answers[i] == correct_answers[i]
-            comparison_data.append({
-                'Question No.': i + 1,
-                'Your Answer': submitted_answers[i] if submitted_answers[i] else 'Not Answered',
-                'Correct Answer': correct_answers[i],
-                'Status': 'Correct' if is_correct else 'Incorrect',
-                'Remarks': '✓' if is_correct else '✗'
-            })
-
-        comparison_df = pd.DataFrame(comparison_data)
-        comparison_df.to_excel(
-            writer, sheet_name='Answer Comparison', index=False)
-
-        comparison_sheet = writer.sheets['Answer Comparison']
+        comparison_data = {
+            'Question No.': question_numbers,
+            'Your Answer': np.where(unanswered, 'Not Answered', sub),
+            'Correct Answer': cor,
+            'Status': np.where(is_correct, 'Correct', 'Incorrect'),
+            'Remarks': np.where(is_correct, '✓', '✗')
+        }
+
+        comparison_sheet = workbook.add_worksheet('Answer Comparison')
         comparison_sheet.set_column('A:A', 15)  # Question No.
         comparison_sheet.set_column('B:B', 15)  # Your Answer
         comparison_sheet.set_column('C:C', 15)  # Correct Answer
         comparison_sheet.set_column('D:D', 12)  # Status
         comparison_sheet.set_column('E:E', 10)  # Remarks
+        _write_table(comparison_sheet, comparison_data, formats['header'], formats['cell'])
 
-        # Apply formatting to header
-        for col_num, value in enumerate(comparison_df.columns.values):
-            comparison_sheet.write(0, col_num, value, header_format)
-
-        # Apply conditional formatting to data
-        for row_num in range(1, len(comparison_df) + 1):
-            for col_num in range(len(comparison_df.columns)):
-                cell_value = comparison_df.iloc[row_num-1, col_num]
-
-                # Apply different formats based on status
-                if col_num == 3:  # Status column
-                    if cell_value == 'Correct':
-                        comparison_sheet.write(
-                            row_num, col_num, cell_value, correct_format)
-                    else:
-                        comparison_sheet.write(
-                            row_num, col_num, cell_value, incorrect_format)
-                elif col_num == 4:  # Remarks column
-                    if cell_value == '✓':
-                        comparison_sheet.write(
-                            row_num, col_num, cell_value, correct_format)
-                    else:
-                        comparison_sheet.write(
-                            row_num, col_num, cell_value, incorrect_format)
-                else:
-                    comparison_sheet.write(
-                        row_num, col_num, cell_value, cell_format)
+        # Colour Status and Remarks by correctness
+        num_rows = len(question_numbers)
+        _highlight_column(comparison_sheet, 3, num_rows, '"Correct"',
+                          formats['correct'], formats['incorrect'])
+        _highlight_column(comparison_sheet, 4, num_rows, '"✓"',
+                          formats['correct'], formats['incorrect'])
 
         # ========== Sheet 3: Performance Analysis ==========
+        # Unanswered questions are reported separately, not as incorrect
+        not_answered = int(unanswered.sum())
         analysis_data = {
             'Metric': [
                 'Total Questions',
@@ -389,535 +899,678 @@ def create_excel_download(student_name, chapter_name, score, total_questions,
             'Value': [
                 total_questions,
                 score,
-                total_questions - score,
-                sum(1 for ans in submitted_answers if ans is None),
+                total_questions - score - not_answered,
+                not_answered,
                 f"{score}/{total_questions}",
-                f"{percentage:.2f}%",
-                f"{(score/total_questions*100):.2f}%"
+                percentage_text,
+                percentage_text
             ]
         }
 
-        analysis_df = pd.DataFrame(analysis_data)
-        analysis_df.to_excel(
-            writer, sheet_name='Performance Analysis', index=False)
-
-        analysis_sheet = writer.sheets['Performance Analysis']
+        analysis_sheet = workbook.add_worksheet('Performance Analysis')
         analysis_sheet.set_column('A:A', 25)
         analysis_sheet.set_column('B:B', 20)
-
-        # Apply formatting to header
-        for col_num, value in enumerate(analysis_df.columns.values):
-            analysis_sheet.write(0, col_num, value, header_format)
-
-        # Apply formatting to data
-        for row_num in range(1, len(analysis_df) + 1):
-            for col_num in range(len(analysis_df.columns)):
-                analysis_sheet.write(row_num, col_num,
-                                     analysis_df.iloc[row_num-1, col_num],
-                                     summary_format if col_num == 0 else cell_format)
+        analysis_sheet.write_row(0, 0, list(analysis_data), formats['header'])
+        for row_num, (metric, value) in enumerate(
+                zip(analysis_data['Metric'], analysis_data['Value']), start=1):
+            analysis_sheet.write(row_num, 0, metric, formats['summary'])
+            analysis_sheet.write(row_num, 1, value, formats['cell'])
 
         # ========== Sheet 4: Question-wise Detail ==========
-        detail_data = []
-        for i in range(len(submitted_answers)):
-            is_correct = submitted_answers[i] == correct_answers[i]
-            detail_data.append({
-                'Q.No': i + 1,
-                'Your Answer': submitted_answers[i] if submitted_answers[i] else 'N/A',
-                'Correct Answer': correct_answers[i],
-                'Is Correct': 'Yes' if is_correct else 'No',
-                'Points': 1 if is_correct else 0,
-                'Feedback': 'Well done!' if is_correct else 'Review this topic'
-            })
-
-        detail_df = pd.DataFrame(detail_data)
-        detail_df.to_excel(writer, sheet_name='Question Details', index=False)
-
-        detail_sheet = writer.sheets['Question Details']
+        detail_data = {
+            'Q.No': question_numbers,
+            'Your Answer': np.where(unanswered, 'N/A', sub),
+            'Correct Answer': cor,
+            'Is Correct': np.where(is_correct, 'Yes', 'No'),
+            'Points': is_correct.astype(int),
+            'Feedback': np.where(is_correct, 'Well done!', 'Review this topic')
+        }
+
+        detail_sheet = workbook.add_worksheet('Question Details')
         detail_sheet.set_column('A:A', 8)   # Q.No
         detail_sheet.set_column('B:B', 12)  # Your Answer
         detail_sheet.set_column('C:C', 12)  # Correct Answer
         detail_sheet.set_column('D:D', 10)  # Is Correct
         detail_sheet.set_column('E:E', 8)   # Points
         detail_sheet.set_column('F:F', 25)  # Feedback
+        _write_table(detail_sheet, detail_data, formats['header'], formats['cell'])
 
-        # Apply formatting to header
-        for col_num, value in enumerate(detail_df.columns.values):
-            detail_sheet.write(0, col_num, value, header_format)
-
-        # Apply conditional formatting to data
-        for row_num in range(1, len(detail_df) + 1):
-            for col_num in range(len(detail_df.columns)):
-                cell_value = detail_df.iloc[row_num-1, col_num]
-
-                # Apply different formats based on correctness
-                if col_num == 3:  # Is Correct column
-                    if cell_value == 'Yes':
-                        detail_sheet.write(
-                            row_num, col_num, cell_value, correct_format)
-                    else:
-                        detail_sheet.write(
-                            row_num, col_num, cell_value, incorrect_format)
-                elif col_num == 4:  # Points column
-                    if cell_value == 1:
-                        detail_sheet.write(
-                            row_num, col_num, cell_value, correct_format)
-                    else:
-                        detail_sheet.write(
-                            row_num, col_num, cell_value, incorrect_format)
-                else:
-                    detail_sheet.write(
-                        row_num, col_num, cell_value, cell_format)
+        # Colour Is Correct and Points by correctness
+        num_rows = len(question_numbers)
+        _highlight_column(detail_sheet, 3, num_rows, '"Yes"',
+                          formats['correct'], formats['incorrect'])
+        _highlight_column(detail_sheet, 4, num_rows, 1,
+                          formats['correct'], formats['incorrect'])
 
     # Get the Excel data
     excel_data = output.getvalue()
     return excel_data
 
-# Streamlit UI
-
-
-def main():
-    st.set_page_config(page_title="OMR Sheet Submission System",
-                       page_icon="📝", layout="wide")
-
-    # Initialize database manager
-    db = DatabaseManager('omr_data.db')
-    
-    # Store db manager in session state for use across pages
-    if 'db' not in st.session_state:
-        st.session_state.db = db
-    else:
-        db = st.session_state.db
-    
-    st.markdown("""
-    <link rel="preconnect" href="https://fonts.googleapis.com">
-    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-    <link href="https://fonts.googleapis.com/css2?family=Plus+Jakarta+Sans:wght@400;500;600;700;800&family=Inter:wght@300;400;500;600&display=swap" rel="stylesheet">
-    
-    <style>
-    /* Modern Design System */
-    :root {
-        --primary: #6366f1;
-        --primary-dark: #4f46e5;
-        --secondary: #ec4899;
-        --accent: #8b5cf6;
-        --success: #10b981;
-        --error: #ef4444;
-        --warning: #f59e0b;
-        --info: #3b82f6;
-        --text-main: #0f172a;
-        --text-muted: #64748b;
-        --bg-light: #f8fafc;
-        --border: rgba(0, 0, 0, 0.08);
-        --shadow-sm: 0 1px 3px 0 rgba(0, 0, 0, 0.08), 0 1px 2px 0 rgba(0, 0, 0, 0.04);
-        --shadow-md: 0 4px 6px -1px rgba(0, 0, 0, 0.1), 0 2px 4px -1px rgba(0, 0, 0, 0.06);
-        --shadow-lg: 0 10px 15px -3px rgba(0, 0, 0, 0.1), 0 4px 6px -2px rgba(0, 0, 0, 0.05);
-    }
-
-    * {
-        margin: 0;
-        padding: 0;
-        box-sizing: border-box;
-    }
-
-    .stApp {
-        background: linear-gradient(135deg, #f8fafc 0%, #f0f9ff 50%, #f5f3ff 100%) !important;
-        font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif !important;
-        color: var(--text-main) !important;
-    }
-
-    h1 { 
-        font-family: 'Plus Jakarta Sans', sans-serif !important;
-        font-size: 2.5rem !important;
-        font-weight: 800 !important;
-        letter-spacing: -0.025em !important;
-        color: var(--text-main) !important;
-        margin-bottom: 1rem !important;
-    }
-
-    h2 {
-        font-family: 'Plus Jakarta Sans', sans-serif !important;
-        font-size: 2rem !important;
-        font-weight: 700 !important;
-        letter-spacing: -0.02em !important;
-        color: var(--text-main) !important;
-        margin-bottom: 1.5rem !important;
-    }
-
-    h3 {
-        font-family: 'Plus Jakarta Sans', sans-serif !important;
-        font-size: 1.5rem !important;
-        font-weight: 700 !important;
-        color: var(--text-main) !important;
-    }
-
-    /* Modern Card Styling */
-    .glass-card {
-        background: rgba(255, 255, 255, 0.85) !important;
-        backdrop-filter: blur(10px) !important;
-        border: 1px solid rgba(255, 255, 255, 0.3) !important;
-        border-radius: 16px !important;
-        padding: 2rem !important;
-        box-shadow: var(--shadow-md) !important;
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1) !important;
-        margin-bottom: 2rem !important;
-    }
-
-    .glass-card:hover {
-        box-shadow: var(--shadow-lg) !important;
-        transform: translateY(-2px) !important;
-    }
-
-    /* Modern Button Styling */
-    .stButton > button {
-        background: linear-gradient(135deg, #6366f1 0%, #8b5cf6 100%) !important;
-        color: white !important;
-        border: none !important;
-        border-radius: 10px !important;
-        padding: 12px 24px !important;
-        font-family: 'Plus Jakarta Sans', sans-serif !important;
-        font-weight: 600 !important;
-        font-size: 0.95rem !important;
-        box-shadow: 0 4px 12px rgba(99, 102, 241, 0.3) !important;
-        transition: all 0.3s ease !important;
-    }
-
-    .stButton > button:hover {
-        transform: translateY(-2px) !important;
-        box-shadow: 0 8px 20px rgba(99, 102, 241, 0.4) !important;
-    }
-
-    /* Input Styling */
-    .stTextInput > div > div > input,
-    .stSelectbox > div > div > select,
-    textarea {
-        background-color: white !important;
-        border: 1px solid var(--border) !important;
-        border-radius: 10px !important;
-        padding: 10px 14px !important;
-        font-size: 0.95rem !important;
-        transition: all 0.2s ease !important;
-    }
-
-    .stTextInput > div > div > input:focus,
-    .stSelectbox > div > div > select:focus,
-    textarea:focus {
-        border-color: var(--primary) !important;
-        box-shadow: 0 0 0 3px rgba(99, 102, 241, 0.1) !important;
-        outline: none !important;
-    }
 
-    /* Modern Radio Buttons */
-    div[data-baseweb="radio"] {
-        display: flex !important;
-        flex-direction: row !important;
-        flex-wrap: wrap !important;
-        gap: 12px !important;
-    }
+@st.cache_data(ttl=300, show_spinner=False, max_entries=64)
+def build_attempt_report(attempt_id: int, student_name: str, chapter_name: str,
+                         score: float, total_questions: int, percentage: float,
+                         attempt_number: int, stored_submitted: str,
+                         stored_correct: str, submitted_at: str) -> bytes:
+    """
+    Build the Excel report for a saved attempt, cached across reruns and sessions
+
+    Args:
+        attempt_id: ID of the attempt (part of the cache key)
+        student_name: Name of the student
+        chapter_name: Name of the chapter
+        score: Score obtained
+        total_questions: Total number of questions
+        percentage: Percentage score
+        attempt_number: Attempt number
+        stored_submitted: Value of the attempt's submitted_answers column
+        stored_correct: Value of the chapter's correct_answers column
+        submitted_at: Submission timestamp
+
+    Returns:
+        Excel file as bytes
+    """
+    submitted_answers, correct_answers = decode_answer_arrays(
+        stored_submitted, stored_correct)
+    return create_excel_download(
+        student_name=student_name,
+        chapter_name=chapter_name,
+        score=score,
+        total_questions=total_questions,
+        percentage=percentage,
+        attempt_number=attempt_number,
+        submitted_answers=submitted_answers,
+        correct_answers=correct_answers,
+        submitted_at=submitted_at
+    )
 
-    div[data-baseweb="radio"] label {
-        background: white !important;
-        border: 2px solid var(--border) !important;
-        border-radius: 10px !important;
-        padding: 12px 20px !important;
-        font-family: 'Plus Jakarta Sans', sans-serif !important;
-        font-weight: 600 !important;
-        transition: all 0.2s ease !important;
-        cursor: pointer !important;
-        box-shadow: var(--shadow-sm) !important;
-    }
-
-    div[data-baseweb="radio"] label:hover {
-        border-color: var(--primary) !important;
-        background: rgba(99, 102, 241, 0.05) !important;
-        transform: translateY(-1px) !important;
-    }
+# Streamlit UI
 
-    div[data-baseweb="radio"] label[data-checked="true"] {
-        background: linear-gradient(135deg, #6366f1 0%, #8b5cf6 100%) !important;
-        color: white !important;
-        border-color: var(--primary) !important;
-        box-shadow: 0 4px 12px rgba(99, 102, 241, 0.3) !important;
-    }
 
-    /* Metric Cards */
-    .metric-card {
-        background: white !important;
-        border-radius: 14px !important;
-        padding: 1.75rem !important;
-        border: 1px solid var(--border) !important;
-        box-shadow: var(--shadow-sm) !important;
-        text-align: center !important;
-        transition: all 0.3s ease !important;
-        position: relative !important;
-        overflow: hidden !important;
-    }
-
-    .metric-card::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        height: 3px;
-        background: linear-gradient(90deg, var(--primary), var(--accent));
+# ==================== Page Markup ====================
+
+# Static page chrome, built once at import instead of on every rerun
+_PAGE_STYLE = """
+<link rel="preconnect" href="https://fonts.googleapis.com">
+<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+<link href="https://fonts.googleapis.com/css2?family=Plus+Jakarta+Sans:wght@400;500;600;700;800&family=Inter:wght@300;400;500;600&display=swap" rel="stylesheet">
+
+<style>
+/* Modern Design System */
+:root {
+    --primary: #6366f1;
+    --primary-dark: #4f46e5;
+    --secondary: #ec4899;
+    --accent: #8b5cf6;
+    --success: #10b981;
+    --error: #ef4444;
+    --warning: #f59e0b;
+    --info: #3b82f6;
+    --text-main: #0f172a;
+    --text-muted: #64748b;
+    --bg-light: #f8fafc;
+    --border: rgba(0, 0, 0, 0.08);
+    --shadow-sm: 0 1px 3px 0 rgba(0, 0, 0, 0.08), 0 1px 2px 0 rgba(0, 0, 0, 0.04);
+    --shadow-md: 0 4px 6px -1px rgba(0, 0, 0, 0.1), 0 2px 4px -1px rgba(0, 0, 0, 0.06);
+    --shadow-lg: 0 10px 15px -3px rgba(0, 0, 0, 0.1), 0 4px 6px -2px rgba(0, 0, 0, 0.05);
+}
+
+* {
+    margin: 0;
+    padding: 0;
+    box-sizing: border-box;
+}
+
+.stApp {
+    background: linear-gradient(135deg, #f8fafc 0%, #f0f9ff 50%, #f5f3ff 100%) !important;
+    font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif !important;
+    color: var(--text-main) !important;
+}
+
+h1 { 
+    font-family: 'Plus Jakarta Sans', sans-serif !important;
+    font-size: 2.5rem !important;
+    font-weight: 800 !important;
+    letter-spacing: -0.025em !important;
+    color: var(--text-main) !important;
+    margin-bottom: 1rem !important;
+}
+
+h2 {
+    font-family: 'Plus Jakarta Sans', sans-serif !important;
+    font-size: 2rem !important;
+    font-weight: 700 !important;
+    letter-spacing: -0.02em !important;
+    color: var(--text-main) !important;
+    margin-bottom: 1.5rem !important;
+}
+
+h3 {
+    font-family: 'Plus Jakarta Sans', sans-serif !important;
+    font-size: 1.5rem !important;
+    font-weight: 700 !important;
+    color: var(--text-main) !important;
+}
+
+/* Modern Card Styling */
+.glass-card {
+    background: rgba(255, 255, 255, 0.85) !important;
+    backdrop-filter: blur(10px) !important;
+    border: 1px solid rgba(255, 255, 255, 0.3) !important;
+    border-radius: 16px !important;
+    padding: 2rem !important;
+    box-shadow: var(--shadow-md) !important;
+    transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1) !important;
+    margin-bottom: 2rem !important;
+}
+
+.glass-card:hover {
+    box-shadow: var(--shadow-lg) !important;
+    transform: translateY(-2px) !important;
+}
+
+/* Modern Button Styling */
+.stButton > button {
+    background: linear-gradient(135deg, #6366f1 0%, #8b5cf6 100%) !important;
+    color: white !important;
+    border: none !important;
+    border-radius: 10px !important;
+    padding: 12px 24px !important;
+    font-family: 'Plus Jakarta Sans', sans-serif !important;
+    font-weight: 600 !important;
+    font-size: 0.95rem !important;
+    box-shadow: 0 4px 12px rgba(99, 102, 241, 0.3) !important;
+    transition: all 0.3s ease !important;
+}
+
+.stButton > button:hover {
+    transform: translateY(-2px) !important;
+    box-shadow: 0 8px 20px rgba(99, 102, 241, 0.4) !important;
+}
+
+/* Input Styling */
+.stTextInput > div > div > input,
+.stSelectbox > div > div > select,
+textarea {
+    background-color: white !important;
+    border: 1px solid var(--border) !important;
+    border-radius: 10px !important;
+    padding: 10px 14px !important;
+    font-size: 0.95rem !important;
+    transition: all 0.2s ease !important;
+}
+
+.stTextInput > div > div > input:focus,
+.stSelectbox > div > div > select:focus,
+textarea:focus {
+    border-color: var(--primary) !important;
+    box-shadow: 0 0 0 3px rgba(99, 102, 241, 0.1) !important;
+    outline: none !important;
+}
+
+/* Modern Radio Buttons */
+div[data-baseweb="radio"] {
+    display: flex !important;
+    flex-direction: row !important;
+    flex-wrap: wrap !important;
+    gap: 12px !important;
+}
+
+div[data-baseweb="radio"] label {
+    background: white !important;
+    border: 2px solid var(--border) !important;
+    border-radius: 10px !important;
+    padding: 12px 20px !important;
+    font-family: 'Plus Jakarta Sans', sans-serif !important;
+    font-weight: 600 !important;
+    transition: all 0.2s ease !important;
+    cursor: pointer !important;
+    box-shadow: var(--shadow-sm) !important;
+}
+
+div[data-baseweb="radio"] label:hover {
+    border-color: var(--primary) !important;
+    background: rgba(99, 102, 241, 0.05) !important;
+    transform: translateY(-1px) !important;
+}
+
+div[data-baseweb="radio"] label[data-checked="true"] {
+    background: linear-gradient(135deg, #6366f1 0%, #8b5cf6 100%) !important;
+    color: white !important;
+    border-color: var(--primary) !important;
+    box-shadow: 0 4px 12px rgba(99, 102, 241, 0.3) !important;
+}
+
+/* Metric Cards */
+.metric-card {
+    background: white !important;
+    border-radius: 14px !important;
+    padding: 1.75rem !important;
+    border: 1px solid var(--border) !important;
+    box-shadow: var(--shadow-sm) !important;
+    text-align: center !important;
+    transition: all 0.3s ease !important;
+    position: relative !important;
+    overflow: hidden !important;
+}
+
+.metric-card::before {
+    content: '';
+    position: absolute;
+    top: 0;
+    left: 0;
+    right: 0;
+    height: 3px;
+    background: linear-gradient(90deg, var(--primary), var(--accent));
+    opacity: 0;
+    transition: opacity 0.3s ease;
+}
+
+.metric-card:hover {
+    border-color: var(--primary) !important;
+    box-shadow: var(--shadow-md) !important;
+    transform: translateY(-4px) !important;
+}
+
+.metric-card:hover::before {
+    opacity: 1;
+}
+
+.metric-value {
+    font-family: 'Plus Jakarta Sans', sans-serif !important;
+    font-size: 2.5rem !important;
+    font-weight: 800 !important;
+    background: linear-gradient(135deg, var(--primary) 0%, var(--accent) 100%) !important;
+    -webkit-background-clip: text !important;
+    -webkit-text-fill-color: transparent !important;
+    line-height: 1 !important;
+    margin-bottom: 0.5rem !important;
+}
+
+.metric-label {
+    font-family: 'Inter', sans-serif !important;
+    font-size: 0.85rem !important;
+    font-weight: 600 !important;
+    color: var(--text-muted) !important;
+    text-transform: uppercase !important;
+    letter-spacing: 0.1em !important;
+}
+
+/* Status Badges */
+.badge {
+    padding: 6px 14px !important;
+    border-radius: 20px !important;
+    font-weight: 600 !important;
+    font-size: 0.85rem !important;
+    display: inline-flex !important;
+    align-items: center !important;
+    gap: 6px !important;
+}
+
+.bg-success { background: rgba(16, 185, 129, 0.1) !important; color: var(--success) !important; }
+.bg-danger { background: rgba(239, 68, 68, 0.1) !important; color: var(--error) !important; }
+.bg-warning { background: rgba(245, 158, 11, 0.1) !important; color: var(--warning) !important; }
+.bg-info { background: rgba(59, 130, 246, 0.1) !important; color: var(--info) !important; }
+
+/* Alert Styling */
+.stAlert {
+    background: white !important;
+    border: 1px solid var(--border) !important;
+    border-radius: 12px !important;
+    padding: 1.25rem !important;
+    box-shadow: var(--shadow-sm) !important;
+}
+
+/* Main Container */
+.block-container {
+    max-width: 1400px !important;
+    padding-top: 2rem !important;
+    padding-bottom: 4rem !important;
+}
+
+/* Table Styling */
+.table {
+    font-size: 0.95rem !important;
+    border-collapse: collapse !important;
+}
+
+.table thead {
+    background: rgba(0, 0, 0, 0.02) !important;
+    border-bottom: 2px solid var(--border) !important;
+}
+
+.table thead th {
+    color: var(--text-muted) !important;
+    font-weight: 700 !important;
+    padding: 1rem !important;
+    letter-spacing: 0.05em !important;
+    font-size: 0.85rem !important;
+    text-transform: uppercase !important;
+}
+
+.table tbody td {
+    padding: 1rem !important;
+    border-bottom: 1px solid var(--border) !important;
+    color: var(--text-main) !important;
+}
+
+.table tbody tr:hover {
+    background: rgba(0, 0, 0, 0.02) !important;
+}
+
+/* Navigation Tabs */
+.stTabs [data-baseweb="tab-list"] {
+    gap: 12px !important;
+    border-bottom: 1px solid var(--border) !important;
+}
+
+.stTabs [data-baseweb="tab"] {
+    border-radius: 10px 10px 0 0 !important;
+    padding: 12px 24px !important;
+    border: none !important;
+    font-weight: 600 !important;
+}
+
+.stTabs [aria-selected="true"] {
+    border-bottom: 2px solid var(--primary) !important;
+    color: var(--primary) !important;
+}
+
+/* Scrollbar Styling */
+::-webkit-scrollbar {
+    width: 8px;
+    height: 8px;
+}
+
+::-webkit-scrollbar-track {
+    background: rgba(0, 0, 0, 0.05);
+}
+
+::-webkit-scrollbar-thumb {
+    background: var(--primary);
+    border-radius: 4px;
+}
+
+::-webkit-scrollbar-thumb:hover {
+    background: var(--primary-dark);
+}
+
+/* Animations */
+@keyframes slideUp {
+    from {
         opacity: 0;
-        transition: opacity 0.3s ease;
+        transform: translateY(20px);
     }
-
-    .metric-card:hover {
-        border-color: var(--primary) !important;
-        box-shadow: var(--shadow-md) !important;
-        transform: translateY(-4px) !important;
-    }
-
-    .metric-card:hover::before {
+    to {
         opacity: 1;
+        transform: translateY(0);
     }
+}
+
+@keyframes fadeIn {
+    from { opacity: 0; }
+    to { opacity: 1; }
+}
+
+.glass-card {
+    animation: slideUp 0.4s ease-out;
+}
+
+/* Responsive Design */
+@media (max-width: 768px) {
+    h1 { font-size: 1.75rem !important; }
+    h2 { font-size: 1.5rem !important; }
+    .glass-card { padding: 1.5rem !important; }
+    .block-container { padding-left: 1rem !important; padding-right: 1rem !important; }
+}
+</style>
+"""
+
+_NAV_HEADER = """
+<div style="
+    position: sticky;
+    top: 0;
+    z-index: 999;
+    background: rgba(255, 255, 255, 0.95);
+    backdrop-filter: blur(10px);
+    border-bottom: 1px solid rgba(0, 0, 0, 0.08);
+    padding: 1.5rem 2rem;
+    margin: -2rem -2rem 2rem -2rem;
+    display: flex;
+    justify-content: center;
+    align-items: center;
+    box-shadow: 0 1px 3px rgba(0, 0, 0, 0.08);
+">
+    <div style="text-align: center;">
+        <h1 style="
+            background: linear-gradient(135deg, #6366f1 0%, #8b5cf6 100%);
+            -webkit-background-clip: text;
+            -webkit-text-fill-color: transparent;
+            background-clip: text;
+            font-size: 2.5rem;
+            margin-bottom: 0.25rem;
+        ">📝 OMR Digital Suite</h1>
+        <p style="color: #64748b; font-size: 0.95rem; margin: 0;">Smart Examination & Analytics Platform</p>
+    </div>
+</div>
+"""
+
+_HERO_EXAM = """
+<div style="
+    background: linear-gradient(135deg, #6366f1 0%, #8b5cf6 100%);
+    padding: 3rem 2rem;
+    border-radius: 20px;
+    margin-bottom: 3rem;
+    color: white;
+    position: relative;
+    overflow: hidden;
+    box-shadow: 0 20px 40px rgba(99, 102, 241, 0.2);
+">
+    <div style="position: absolute; top: -10%; right: -5%; width: 300px; height: 300px; background: rgba(255,255,255,0.1); border-radius: 50%;"></div>
+    <div style="position: relative; z-index: 1;">
+        <span style="background: rgba(255,255,255,0.2); padding: 6px 16px; border-radius: 50px; font-size: 0.75rem; font-weight: 700; text-transform: uppercase; letter-spacing: 1.5px;">📝 Smart Examination</span>
+        <h2 style="color: white !important; font-size: 2.5rem; font-weight: 800; margin-top: 1rem; margin-bottom: 0.5rem;">Take a Test</h2>
+        <p style="font-size: 1.1rem; opacity: 0.95; font-weight: 500; max-width: 600px; margin: 0;">Choose your chapter and start testing to identify areas for improvement.</p>
+    </div>
+</div>
+"""
+
+_HERO_RESULTS = """
+<div style="
+    background: linear-gradient(135deg, #0891b2 0%, #06b6d4 100%);
+    padding: 3rem 2rem;
+    border-radius: 20px;
+    margin-bottom: 3rem;
+    color: white;
+    position: relative;
+    overflow: hidden;
+    box-shadow: 0 20px 40px rgba(8, 145, 178, 0.2);
+">
+    <div style="position: absolute; top: -10%; right: -5%; width: 300px; height: 300px; background: rgba(255,255,255,0.1); border-radius: 50%;"></div>
+    <div style="position: relative; z-index: 1;">
+        <span style="background: rgba(255,255,255,0.2); padding: 6px 16px; border-radius: 50px; font-size: 0.75rem; font-weight: 700; text-transform: uppercase; letter-spacing: 1.5px;">📊 Result Analysis</span>
+        <h2 style="color: white !important; font-size: 2.5rem; font-weight: 800; margin-top: 1rem; margin-bottom: 0.5rem;">View Results</h2>
+        <p style="font-size: 1.1rem; opacity: 0.95; font-weight: 500; max-width: 600px; margin: 0;">Review your test attempts and detailed performance metrics.</p>
+    </div>
+</div>
+"""
+
+_HERO_ANALYTICS = """
+<div style="
+    background: linear-gradient(135deg, #059669 0%, #10b981 100%);
+    padding: 3rem 2rem;
+    border-radius: 20px;
+    margin-bottom: 3rem;
+    color: white;
+    position: relative;
+    overflow: hidden;
+    box-shadow: 0 20px 40px rgba(5, 150, 105, 0.2);
+">
+    <div style="position: absolute; top: -10%; right: -5%; width: 300px; height: 300px; background: rgba(255,255,255,0.1); border-radius: 50%;"></div>
+    <div style="position: relative; z-index: 1;">
+        <span style="background: rgba(255,255,255,0.2); padding: 6px 16px; border-radius: 50px; font-size: 0.75rem; font-weight: 700; text-transform: uppercase; letter-spacing: 1.5px;">📈 Analytics Dashboard</span>
+        <h2 style="color: white !important; font-size: 2.5rem; font-weight: 800; margin-top: 1rem; margin-bottom: 0.5rem;">Performance Analytics</h2>
+        <p style="font-size: 1.1rem; opacity: 0.95; font-weight: 500; max-width: 600px; margin: 0;">Comprehensive insights into test performance and student progress.</p>
+    </div>
+</div>
+"""
 
-    .metric-value {
-        font-family: 'Plus Jakarta Sans', sans-serif !important;
-        font-size: 2.5rem !important;
-        font-weight: 800 !important;
-        background: linear-gradient(135deg, var(--primary) 0%, var(--accent) 100%) !important;
-        -webkit-background-clip: text !important;
-        -webkit-text-fill-color: transparent !important;
-        line-height: 1 !important;
-        margin-bottom: 0.5rem !important;
-    }
-
-    .metric-label {
-        font-family: 'Inter', sans-serif !important;
-        font-size: 0.85rem !important;
-        font-weight: 600 !important;
-        color: var(--text-muted) !important;
-        text-transform: uppercase !important;
-        letter-spacing: 0.1em !important;
-    }
-
-    /* Status Badges */
-    .badge {
-        padding: 6px 14px !important;
-        border-radius: 20px !important;
-        font-weight: 600 !important;
-        font-size: 0.85rem !important;
-        display: inline-flex !important;
-        align-items: center !important;
-        gap: 6px !important;
-    }
-
-    .bg-success { background: rgba(16, 185, 129, 0.1) !important; color: var(--success) !important; }
-    .bg-danger { background: rgba(239, 68, 68, 0.1) !important; color: var(--error) !important; }
-    .bg-warning { background: rgba(245, 158, 11, 0.1) !important; color: var(--warning) !important; }
-    .bg-info { background: rgba(59, 130, 246, 0.1) !important; color: var(--info) !important; }
-
-    /* Alert Styling */
-    .stAlert {
-        background: white !important;
-        border: 1px solid var(--border) !important;
-        border-radius: 12px !important;
-        padding: 1.25rem !important;
-        box-shadow: var(--shadow-sm) !important;
-    }
-
-    /* Main Container */
-    .block-container {
-        max-width: 1400px !important;
-        padding-top: 2rem !important;
-        padding-bottom: 4rem !important;
-    }
-
-    /* Table Styling */
-    .table {
-        font-size: 0.95rem !important;
-        border-collapse: collapse !important;
-    }
-
-    .table thead {
-        background: rgba(0, 0, 0, 0.02) !important;
-        border-bottom: 2px solid var(--border) !important;
-    }
-
-    .table thead th {
-        color: var(--text-muted) !important;
-        font-weight: 700 !important;
-        padding: 1rem !important;
-        letter-spacing: 0.05em !important;
-        font-size: 0.85rem !important;
-        text-transform: uppercase !important;
-    }
-
-    .table tbody td {
-        padding: 1rem !important;
-        border-bottom: 1px solid var(--border) !important;
-        color: var(--text-main) !important;
-    }
-
-    .table tbody tr:hover {
-        background: rgba(0, 0, 0, 0.02) !important;
-    }
-
-    /* Navigation Tabs */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 12px !important;
-        border-bottom: 1px solid var(--border) !important;
-    }
-
-    .stTabs [data-baseweb="tab"] {
-        border-radius: 10px 10px 0 0 !important;
-        padding: 12px 24px !important;
-        border: none !important;
-        font-weight: 600 !important;
-    }
-
-    .stTabs [aria-selected="true"] {
-        border-bottom: 2px solid var(--primary) !important;
-        color: var(--primary) !important;
-    }
-
-    /* Scrollbar Styling */
-    ::-webkit-scrollbar {
-        width: 8px;
-        height: 8px;
-    }
-
-    ::-webkit-scrollbar-track {
-        background: rgba(0, 0, 0, 0.05);
-    }
-
-    ::-webkit-scrollbar-thumb {
-        background: var(--primary);
-        border-radius: 4px;
-    }
+# Filled in with str.format for the student's next attempt
+_ATTEMPT_BANNER = """
+<div style="
+    background: linear-gradient(135deg, rgba(59, 130, 246, 0.1) 0%, rgba(99, 102, 241, 0.1) 100%);
+    border: 1px solid rgba(99, 102, 241, 0.3);
+    border-radius: 12px;
+    padding: 1.25rem;
+    color: #0f172a;
+    margin-bottom: 2rem;
+">
+    <strong style="color: #6366f1;">#{attempt_number}</strong> attempt for <strong>{student_name}</strong> on <strong>{chapter_name}</strong>
+</div>
+"""
 
-    ::-webkit-scrollbar-thumb:hover {
-        background: var(--primary-dark);
-    }
 
-    /* Animations */
-    @keyframes slideUp {
-        from {
-            opacity: 0;
-            transform: translateY(20px);
-        }
-        to {
-            opacity: 1;
-            transform: translateY(0);
-        }
-    }
+def set_current_page(page: str):
+    """Navigation button callback: choose the page to draw on this run"""
+    st.session_state.current_page = page
 
-    @keyframes fadeIn {
-        from { opacity: 0; }
-        to { opacity: 1; }
-    }
 
-    .glass-card {
-        animation: slideUp 0.4s ease-out;
-    }
+def main():
+    st.set_page_config(page_title="OMR Sheet Submission System",
+                       page_icon="📝", layout="wide")
 
-    /* Responsive Design */
-    @media (max-width: 768px) {
-        h1 { font-size: 1.75rem !important; }
-        h2 { font-size: 1.5rem !important; }
-        .glass-card { padding: 1.5rem !important; }
-        .block-container { padding-left: 1rem !important; padding-right: 1rem !important; }
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    # Initialize database manager (shared, built once per process)
+    db = get_database_manager('omr_data.db')
+    
+    # Store db manager in session state for use across pages
+    db = st.session_state.setdefault('db', db)
+    
+    st.markdown(_PAGE_STYLE, unsafe_allow_html=True)
 
     # Modern Navigation Header
-    st.markdown("""
-    <div style="
-        position: sticky;
-        top: 0;
-        z-index: 999;
-        background: rgba(255, 255, 255, 0.95);
-        backdrop-filter: blur(10px);
-        border-bottom: 1px solid rgba(0, 0, 0, 0.08);
-        padding: 1.5rem 2rem;
-        margin: -2rem -2rem 2rem -2rem;
-        display: flex;
-        justify-content: center;
-        align-items: center;
-        box-shadow: 0 1px 3px rgba(0, 0, 0, 0.08);
-    ">
-        <div style="text-align: center;">
-            <h1 style="
-                background: linear-gradient(135deg, #6366f1 0%, #8b5cf6 100%);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                background-clip: text;
-                font-size: 2.5rem;
-                margin-bottom: 0.25rem;
-            ">📝 OMR Digital Suite</h1>
-            <p style="color: #64748b; font-size: 0.95rem; margin: 0;">Smart Examination & Analytics Platform</p>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_NAV_HEADER, unsafe_allow_html=True)
 
     # Create modern navigation using columns
     nav_col1, nav_col2, nav_col3 = st.columns(3)
     
-    current_page = st.session_state.get("current_page", "Exam")
+    # A new session starts on the exam page; button callbacks have already
+    # stored any page change by the time this runs
+    current_page = st.session_state.setdefault("current_page", "Exam")
     
+    # The buttons switch pages from on_click callbacks, which run before
+    # the script does, so one run both handles the click and draws the page
     with nav_col1:
-        if st.button("📝 Exam", use_container_width=True, 
-                     key="nav_exam",
-                     help="Take a test"):
-            st.session_state.current_page = "Exam"
-            st.rerun()
+        st.button("📝 Exam", use_container_width=True,
+                  key="nav_exam",
+                  help="Take a test",
+                  on_click=set_current_page, args=("Exam",))
     
     with nav_col2:
-        if st.button("📊 View Results", use_container_width=True,
-                     key="nav_results",
-                     help="View your test results"):
-            st.session_state.current_page = "View Results"
-            st.rerun()
+        st.button("📊 View Results", use_container_width=True,
+                  key="nav_results",
+                  help="View your test results",
+                  on_click=set_current_page, args=("View Results",))
     
     with nav_col3:
-        if st.button("📈 Analytics", use_container_width=True,
-                     key="nav_analytics",
-                     help="View analytics dashboard"):
-            st.session_state.current_page = "Analytics"
-            st.rerun()
+        st.button("📈 Analytics", use_container_width=True,
+                  key="nav_analytics",
+                  help="View analytics dashboard",
+                  on_click=set_current_page, args=("Analytics",))
 
     st.markdown('<div style="margin-bottom: 2rem;"></div>', unsafe_allow_html=True)
 
-    if st.session_state.current_page == "Exam":
+    if current_page == "Exam":
         submit_omr_page()
-    elif st.session_state.current_page == "View Results":
+    elif current_page == "View Results":
         view_results_page()
-    elif st.session_state.current_page == "Analytics":
+    elif current_page == "Analytics":
         analytics_page()
 
 
-def submit_omr_page():
-    """Page to submit exam"""
-    db = st.session_state.db
-    
+def show_submit_result(result: dict):
+    """Render the outcome of the last submitted exam"""
+    if result.pop('celebrate', False):
+        st.balloons()
     st.markdown("""
     <div style="
-        background: linear-gradient(135deg, #6366f1 0%, #8b5cf6 100%);
-        padding: 3rem 2rem;
-        border-radius: 20px;
-        margin-bottom: 3rem;
-        color: white;
-        position: relative;
-        overflow: hidden;
-        box-shadow: 0 20px 40px rgba(99, 102, 241, 0.2);
+        background: rgba(16, 185, 129, 0.1);
+        border: 1px solid rgba(16, 185, 129, 0.3);
+        border-radius: 12px;
+        padding: 1.5rem;
+        color: #065f46;
+        margin: 1.5rem 0;
     ">
-        <div style="position: absolute; top: -10%; right: -5%; width: 300px; height: 300px; background: rgba(255,255,255,0.1); border-radius: 50%;"></div>
-        <div style="position: relative; z-index: 1;">
-            <span style="background: rgba(255,255,255,0.2); padding: 6px 16px; border-radius: 50px; font-size: 0.75rem; font-weight: 700; text-transform: uppercase; letter-spacing: 1.5px;">📝 Smart Examination</span>
-            <h2 style="color: white !important; font-size: 2.5rem; font-weight: 800; margin-top: 1rem; margin-bottom: 0.5rem;">Take a Test</h2>
-            <p style="font-size: 1.1rem; opacity: 0.95; font-weight: 500; max-width: 600px; margin: 0;">Choose your chapter and start testing to identify areas for improvement.</p>
-        </div>
+        <strong style="color: #059669;">✅ Test submitted successfully!</strong><br>
+        View your performance and analysis below.
     </div>
     """, unsafe_allow_html=True)
 
+    # Display Results
+    st.markdown('<div style="margin-top: 2rem;"></div>',
+                unsafe_allow_html=True)
+    st.markdown('<h3 style="font-weight: 800; margin-bottom: 1.5rem;">📊 Performance Summary</h3>',
+                unsafe_allow_html=True)
+
+    score = result['score']
+    num_questions = result['num_questions']
+    percentage = (score / num_questions) * 100
+
+    render_metric_cards([
+        (f"{score}/{num_questions}", "Total Score"),
+        (f"{percentage:.1f}%", "Percentage"),
+        (result['attempt_number'], "Attempt No."),
+    ])
+
+    # Answer comparison
+    st.markdown('<div style="margin-top: 2rem;"></div>',
+                unsafe_allow_html=True)
+    st.markdown("""<div class="glass-card">""", unsafe_allow_html=True)
+    st.markdown('<h3 style="font-weight: 700; margin-bottom: 1.5rem;">📋 Answer Comparison</h3>',
+                unsafe_allow_html=True)
+
+    sub = np.asarray(result['submitted_answers'], dtype=object)
+    cor = np.asarray(result['correct_answers'], dtype=object)
+    is_correct = sub == cor
+    df_display = pd.DataFrame({
+        'Q.No': np.arange(1, len(sub) + 1),
+        'Your Answer': sub,
+        'Correct Answer': cor,
+        'Status': np.where(is_correct, "✅ Correct", "❌ Wrong")
+    })
+
+    st.dataframe(df_display, hide_index=True,
+                 use_container_width=True)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+
+# Longer exams get one answer grid instead of a radio group per question,
+# since every mounted widget adds to the cost of each rerun
+GRID_QUESTION_THRESHOLD = 50
+
+# Balloons hold the browser busy for several seconds, so they are skipped
+# after longer exams, where the result table is large too
+CELEBRATE_MAX_QUESTIONS = 50
+
+
+def submit_omr_page():
+    """Page to submit exam"""
+    db = st.session_state.db
+    
+    st.markdown(_HERO_EXAM, unsafe_allow_html=True)
+
+    # Show the last submission until the student starts over
+    last_result = st.session_state.get('last_result')
+    if last_result is not None:
+        show_submit_result(last_result)
+        if st.button("📝 Start New Attempt", use_container_width=True):
+            del st.session_state.last_result
+            st.rerun()
+        return
+
     # Get all chapters
-    chapters_df = db.get_all_chapters()
+    chapter_names = db.get_chapter_names()
 
-    if chapters_df.empty:
+    if not chapter_names:
         st.markdown("""
         <div style="
             background: rgba(239, 68, 68, 0.1);
@@ -944,7 +1597,7 @@ def submit_omr_page():
     with col2:
         chapter_name = st.selectbox(
             "📚 Select Chapter",
-            options=chapters_df['chapter_name'].tolist(),
+            options=chapter_names,
             help="Choose the chapter for the test"
         )
 
@@ -953,24 +1606,17 @@ def submit_omr_page():
     if chapter_name:
         # Get chapter details
         chapter = db.get_chapter_by_name(chapter_name)
-        chapter_id, _, num_questions, num_options, correct_answers_json, _ = chapter
-        correct_answers = json.loads(correct_answers_json)
+        chapter_id = chapter.id
+        num_questions = chapter.num_questions
+        num_options = chapter.num_options
+        correct_answers = decode_answer_key(chapter.correct_answers)
 
         # Display attempt count
         if student_name:
             attempt_count = db.get_attempt_count(chapter_id, student_name)
-            st.markdown(f"""
-            <div style="
-                background: linear-gradient(135deg, rgba(59, 130, 246, 0.1) 0%, rgba(99, 102, 241, 0.1) 100%);
-                border: 1px solid rgba(99, 102, 241, 0.3);
-                border-radius: 12px;
-                padding: 1.25rem;
-                color: #0f172a;
-                margin-bottom: 2rem;
-            ">
-                <strong style="color: #6366f1;">#{attempt_count + 1}</strong> attempt for <strong>{student_name}</strong> on <strong>{chapter_name}</strong>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(_ATTEMPT_BANNER.format(
+                attempt_number=attempt_count + 1, student_name=student_name,
+                chapter_name=chapter_name), unsafe_allow_html=True)
 
         option_letters = get_option_letters(num_options)
 
@@ -989,43 +1635,55 @@ def submit_omr_page():
         </div>
         """, unsafe_allow_html=True)
 
-        # Create answer input with OMR-style radio buttons
-        submitted_answers = []
-
-        # Calculate questions per column
-        questions_per_column = (num_questions + 1) // 2
-
-        # Create 2 columns for better layout
-        col1, col2 = st.columns(2)
-
-        # First column - questions 1 to questions_per_column
-        with col1:
-            for i in range(questions_per_column):
-                if i < num_questions:
-                    answer = st.radio(
-                        f"**Q{i+1}**",
-                        options=option_letters,
-                        horizontal=True,
-                        index=None,
-                        key=f"submit_answer_{i}",
-                    )
-                    submitted_answers.append(answer)
-
-        # Second column - remaining questions
-        with col2:
-            for i in range(questions_per_column, num_questions):
-                answer = st.radio(
-                    f"**Q{i+1}**",
-                    options=option_letters,
-                    horizontal=True,
-                    index=None,
-                    key=f"submit_answer_{i}",
+        # Answers live in a form so picking them does not rerun the
+        # whole page; the script only runs again on submit
+        with st.form("omr_form", border=False):
+            if num_questions > GRID_QUESTION_THRESHOLD:
+                # One editable grid, read back as a single column
+                answer_grid = st.data_editor(
+                    pd.DataFrame({
+                        "Question": np.arange(1, num_questions + 1),
+                        "Answer": pd.Series([None] * num_questions, dtype=object),
+                    }),
+                    column_config={
+                        "Question": st.column_config.NumberColumn(disabled=True),
+                        "Answer": st.column_config.SelectboxColumn(
+                            options=list(option_letters), required=True),
+                    },
+                    hide_index=True,
+                    num_rows="fixed",
+                    use_container_width=True,
+                    key="omr_grid",
                 )
-                submitted_answers.append(answer)
+                submitted_answers = [None if pd.isna(ans) else ans
+                                     for ans in answer_grid["Answer"].tolist()]
+            else:
+                # Create answer input with OMR-style radio buttons
+                submitted_answers = [None] * num_questions
+
+                # Calculate questions per column
+                questions_per_column = (num_questions + 1) // 2
+
+                # Create 2 columns for better layout; the first holds
+                # questions 1 to questions_per_column, the second the rest
+                col1, col2 = st.columns(2)
+
+                for i in range(num_questions):
+                    with col1 if i < questions_per_column else col2:
+                        submitted_answers[i] = st.radio(
+                            f"**Q{i+1}**",
+                            options=option_letters,
+                            horizontal=True,
+                            index=None,
+                            key=f"submit_answer_{i}",
+                        )
+
+            submitted = st.form_submit_button(
+                "🚀 Submit Examination", use_container_width=True)
 
         st.markdown('</div>', unsafe_allow_html=True)
 
-        if st.button("🚀 Submit Examination", use_container_width=True, key="submit_exam"):
+        if submitted:
             # Validate all answers are selected
             if None in submitted_answers:
                 st.error("⚠️ Please answer all questions before submitting!")
@@ -1036,97 +1694,25 @@ def submit_omr_page():
                 # Calculate score
                 score = calculate_score(correct_answers, submitted_answers)
                 
-                # Save attempt to database
-                success = db.save_attempt(
-                    chapter_id, student_name, submitted_answers, 
-                    score, len(correct_answers), attempt_count + 1
+                # Save attempt to database; it is numbered in the same
+                # transaction, so two quick submits cannot share a number
+                attempt_number = db.save_attempt_with_count(
+                    chapter_id, student_name, submitted_answers,
+                    score, len(correct_answers)
                 )
                 
-                if success:
-                    st.balloons()
-                    st.markdown("""
-                    <div style="
-                        background: rgba(16, 185, 129, 0.1);
-                        border: 1px solid rgba(16, 185, 129, 0.3);
-                        border-radius: 12px;
-                        padding: 1.5rem;
-                        color: #065f46;
-                        margin: 1.5rem 0;
-                    ">
-                        <strong style="color: #059669;">✅ Test submitted successfully!</strong><br>
-                        View your performance and analysis below.
-                    </div>
-                    """, unsafe_allow_html=True)
-
-                    # Display Results
-                    st.markdown('<div style="margin-top: 2rem;"></div>',
-                                unsafe_allow_html=True)
-                    st.markdown('<h3 style="font-weight: 800; margin-bottom: 1.5rem;">📊 Performance Summary</h3>',
-                                unsafe_allow_html=True)
-
-                    m_col1, m_col2, m_col3 = st.columns(3)
-
-                    score = attempt_result[3]
-                    percentage = (score / num_questions) * 100
-
-                    with m_col1:
-                        st.markdown(f"""
-                        <div class="metric-card">
-                            <div class="metric-value">{score}/{num_questions}</div>
-                            <div class="metric-label">Total Score</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    with m_col2:
-                        st.markdown(f"""
-                        <div class="metric-card">
-                            <div class="metric-value">{percentage:.1f}%</div>
-                            <div class="metric-label">Percentage</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    with m_col3:
-                        st.markdown(f"""
-                        <div class="metric-card">
-                            <div class="metric-value">{attempt_count + 1}</div>
-                            <div class="metric-label">Attempt No.</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-
-                    # Answer comparison
-                    st.markdown('<div style="margin-top: 2rem;"></div>',
-                                unsafe_allow_html=True)
-                    st.markdown("""<div class="glass-card">""", unsafe_allow_html=True)
-                    st.markdown('<h3 style="font-weight: 700; margin-bottom: 1.5rem;">📋 Answer Comparison</h3>',
-                                unsafe_allow_html=True)
-
-                    comparison_data = []
-                    for i in range(len(submitted_answers)):
-                        is_correct = submitted_answers[i] == correct_answers[i]
-                        status = "✅ Correct" if is_correct else "❌ Wrong"
-                        comparison_data.append({
-                            'Q.No': i + 1,
-                            'Your Answer': submitted_answers[i],
-                            'Correct Answer': correct_answers[i],
-                            'Status': status,
-                            'IsCorrect': is_correct
-                        })
-
-                    df_comparison = pd.DataFrame(comparison_data)
-                    df_display = df_comparison.drop(columns=['IsCorrect'])
-
-                    html_table = df_display.to_html(
-                        classes='table table-hover',
-                        index=False,
-                        escape=False
-                    )
-                    html_table = html_table.replace(
-                        '✅ Correct',
-                        '<span class="badge bg-success">✅ Correct</span>')
-                    html_table = html_table.replace(
-                        '❌ Wrong',
-                        '<span class="badge bg-danger">❌ Wrong</span>')
-
-                    st.markdown(html_table, unsafe_allow_html=True)
-                    st.markdown('</div>', unsafe_allow_html=True)
+                if attempt_number is not None:
+                    # Keep the outcome so later reruns can redraw it
+                    # without rebuilding the answer form
+                    st.session_state.last_result = {
+                        'score': score,
+                        'num_questions': num_questions,
+                        'attempt_number': attempt_number,
+                        'submitted_answers': submitted_answers,
+                        'correct_answers': correct_answers,
+                        'celebrate': num_questions <= CELEBRATE_MAX_QUESTIONS
+                    }
+                    st.rerun()
 
             except Exception as e:
                 st.error(f"Error submitting exam: {str(e)}")
@@ -1136,30 +1722,12 @@ def view_results_page():
     """Page to view results chapter-wise"""
     db = st.session_state.db
     
-    st.markdown("""
-    <div style="
-        background: linear-gradient(135deg, #0891b2 0%, #06b6d4 100%);
-        padding: 3rem 2rem;
-        border-radius: 20px;
-        margin-bottom: 3rem;
-        color: white;
-        position: relative;
-        overflow: hidden;
-        box-shadow: 0 20px 40px rgba(8, 145, 178, 0.2);
-    ">
-        <div style="position: absolute; top: -10%; right: -5%; width: 300px; height: 300px; background: rgba(255,255,255,0.1); border-radius: 50%;"></div>
-        <div style="position: relative; z-index: 1;">
-            <span style="background: rgba(255,255,255,0.2); padding: 6px 16px; border-radius: 50px; font-size: 0.75rem; font-weight: 700; text-transform: uppercase; letter-spacing: 1.5px;">📊 Result Analysis</span>
-            <h2 style="color: white !important; font-size: 2.5rem; font-weight: 800; margin-top: 1rem; margin-bottom: 0.5rem;">View Results</h2>
-            <p style="font-size: 1.1rem; opacity: 0.95; font-weight: 500; max-width: 600px; margin: 0;">Review your test attempts and detailed performance metrics.</p>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_HERO_RESULTS, unsafe_allow_html=True)
 
     # Get all chapters
-    chapters_df = db.get_all_chapters()
+    chapter_names = db.get_chapter_names()
 
-    if chapters_df.empty:
+    if not chapter_names:
         st.markdown("""
         <div style="
             background: rgba(239, 68, 68, 0.1);
@@ -1181,7 +1749,7 @@ def view_results_page():
     with row_col1:
         chapter_name = st.selectbox(
             "📚 Select Chapter",
-            options=chapters_df['chapter_name'].tolist(),
+            options=chapter_names,
             key="results_chapter"
         )
 
@@ -1197,23 +1765,28 @@ def view_results_page():
         st.markdown('</div>', unsafe_allow_html=True)
         return
 
+    # Column arrays, so picking an attempt is plain indexing rather than
+    # building a Series per row
+    attempts = {col: attempts_df[col].to_numpy() for col in attempts_df.columns}
+    student_names = attempts['student_name']
+    attempt_numbers = attempts['attempt_number']
+
     with row_col2:
         attempt_index = st.selectbox(
             "👤 Select Student Attempt",
             options=range(len(attempts_df)),
-            format_func=lambda x: f"{attempts_df.iloc[x]['student_name']} - Attempt #{attempts_df.iloc[x]['attempt_number']}",
+            format_func=lambda x: f"{student_names[x]} - Attempt #{attempt_numbers[x]}",
             key="top_attempt_selection"
         )
 
     st.markdown('</div>', unsafe_allow_html=True)
 
     if attempt_index is not None:
-        selected_attempt = attempts_df.iloc[attempt_index]
-        submitted_answers = json.loads(selected_attempt['submitted_answers'])
+        selected_attempt = {col: values[attempt_index]
+                            for col, values in attempts.items()}
 
-        # Get correct answers
+        # Answer key for the comparison table and the report
         chapter = db.get_chapter_by_name(chapter_name)
-        correct_answers = json.loads(chapter[4])
 
         # Display Answer Comparison
         st.markdown("""<div class="glass-card">""", unsafe_allow_html=True)
@@ -1234,53 +1807,18 @@ def view_results_page():
         # or use a blank string if we want it super clean.
         # Let's try visible first to see alignment.
 
-        # Move on to processing
-        comparison_data = []
-        for i in range(len(submitted_answers)):
-            is_correct = submitted_answers[i] == correct_answers[i]
-            status = "✅ Correct" if is_correct else "❌ Wrong"
-            comparison_data.append({
-                "Question": f"Q.{i + 1}",
-                "Student Answer": submitted_answers[i],
-                "Correct Answer": correct_answers[i],
-                "Status": status,
-                "IsCorrect": is_correct
-            })
-
-        df_comparison = pd.DataFrame(comparison_data)
-
-        # Apply filter
-        if filter_option == "Correct":
-            df_filtered = df_comparison[df_comparison['IsCorrect'] == True].copy(
-            )
-        elif filter_option == "Incorrect":
-            df_filtered = df_comparison[df_comparison['IsCorrect'] == False].copy(
-            )
-        else:
-            df_filtered = df_comparison.copy()
-
-        # Remove IsCorrect column for display
-        df_display = df_filtered.drop(columns=['IsCorrect'])
+        # Build (or reuse) the filtered comparison table
+        df_display, total = build_comparison_table(
+            selected_attempt['submitted_answers'], chapter.correct_answers, filter_option)
 
         # Show count
         st.markdown(f"""
         <div class="alert alert-info mt-2 mb-3" role="alert">
-            Showing <strong>{len(df_display)}</strong> of <strong>{len(df_comparison)}</strong> questions
+            Showing <strong>{len(df_display)}</strong> of <strong>{total}</strong> questions
         </div>
         """, unsafe_allow_html=True)
 
-        # Apply Bootstrap table classes
-        html_table = df_display.to_html(
-            classes='table table-hover',
-            index=False,
-            escape=False
-        )
-        html_table = html_table.replace(
-            '✅ Correct', '<span class="badge bg-success">Correct</span>')
-        html_table = html_table.replace(
-            '❌ Wrong', '<span class="badge bg-danger">Wrong</span>')
-
-        st.markdown(html_table, unsafe_allow_html=True)
+        st.dataframe(df_display, hide_index=True, use_container_width=True)
 
         # Export section
         st.markdown('<hr class="my-3">', unsafe_allow_html=True)
@@ -1291,33 +1829,39 @@ def view_results_page():
         </div>
         """, unsafe_allow_html=True)
 
-        # Create Excel file for export
-        excel_data = create_excel_download(
-            student_name=selected_attempt['student_name'],
-            chapter_name=chapter_name,
-            score=selected_attempt['score'],
-            total_questions=selected_attempt['total_questions'],
-            percentage=(selected_attempt['score'] /
-                        selected_attempt['total_questions'] * 100),
-            attempt_number=selected_attempt['attempt_number'],
-            submitted_answers=submitted_answers,
-            correct_answers=correct_answers,
-            submitted_at=selected_attempt['submitted_at']
-        )
+        # Build the Excel file only when asked for; the bytes are kept in
+        # session state so later reruns (e.g. filter clicks) reuse them
+        report_key = f"excel_report_{selected_attempt['id']}"
+        if report_key not in st.session_state:
+            if st.button("📄 Prepare Excel Report", use_container_width=True,
+                         key=f"prepare_report_{attempt_index}"):
+                st.session_state[report_key] = build_attempt_report(
+                    attempt_id=int(selected_attempt['id']),
+                    student_name=selected_attempt['student_name'],
+                    chapter_name=chapter_name,
+                    score=selected_attempt['score'],
+                    total_questions=selected_attempt['total_questions'],
+                    percentage=float(selected_attempt['percentage']),
+                    attempt_number=selected_attempt['attempt_number'],
+                    stored_submitted=selected_attempt['submitted_answers'],
+                    stored_correct=chapter.correct_answers,
+                    submitted_at=selected_attempt['submitted_at']
+                )
 
-        # Create download button
-        filename = f"{selected_attempt['student_name']}_{chapter_name}_Attempt{selected_attempt['attempt_number']}_Comparison.xlsx"
-
-        st.download_button(
-            label="📥 Download Excel Report",
-            data=excel_data,
-            file_name=filename,
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            help="Download complete exam report with answer comparison",
-            use_container_width=True,
-            type="secondary",
-            key=f"download_comparison_{attempt_index}"
-        )
+        if report_key in st.session_state:
+            # Create download button
+            filename = f"{selected_attempt['student_name']}_{chapter_name}_Attempt{selected_attempt['attempt_number']}_Comparison.xlsx"
+
+            st.download_button(
+                label="📥 Download Excel Report",
+                data=st.session_state[report_key],
+                file_name=filename,
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                help="Download complete exam report with answer comparison",
+                use_container_width=True,
+                type="secondary",
+                key=f"download_comparison_{attempt_index}"
+            )
     else:
         st.markdown("""
         <div class="alert alert-info" role="alert">
@@ -1330,30 +1874,12 @@ def analytics_page():
     """Page to show analytics and statistics"""
     db = st.session_state.db
     
-    st.markdown("""
-    <div style="
-        background: linear-gradient(135deg, #059669 0%, #10b981 100%);
-        padding: 3rem 2rem;
-        border-radius: 20px;
-        margin-bottom: 3rem;
-        color: white;
-        position: relative;
-        overflow: hidden;
-        box-shadow: 0 20px 40px rgba(5, 150, 105, 0.2);
-    ">
-        <div style="position: absolute; top: -10%; right: -5%; width: 300px; height: 300px; background: rgba(255,255,255,0.1); border-radius: 50%;"></div>
-        <div style="position: relative; z-index: 1;">
-            <span style="background: rgba(255,255,255,0.2); padding: 6px 16px; border-radius: 50px; font-size: 0.75rem; font-weight: 700; text-transform: uppercase; letter-spacing: 1.5px;">📈 Analytics Dashboard</span>
-            <h2 style="color: white !important; font-size: 2.5rem; font-weight: 800; margin-top: 1rem; margin-bottom: 0.5rem;">Performance Analytics</h2>
-            <p style="font-size: 1.1rem; opacity: 0.95; font-weight: 500; max-width: 600px; margin: 0;">Comprehensive insights into test performance and student progress.</p>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_HERO_ANALYTICS, unsafe_allow_html=True)
 
     # Get all chapters and attempts
-    chapters_df = db.get_all_chapters()
+    chapter_names = db.get_chapter_names()
 
-    if chapters_df.empty:
+    if not chapter_names:
         st.markdown("""
         <div style="
             background: rgba(239, 68, 68, 0.1);
@@ -1367,9 +1893,10 @@ def analytics_page():
         """, unsafe_allow_html=True)
         return
 
-    all_attempts_df = db.get_all_attempts()
+    attempts_version = db.get_attempts_version()
+    overall = db.get_overall_statistics(attempts_version)
 
-    if all_attempts_df.empty:
+    if overall['total_attempts'] == 0:
         st.markdown("""
         <div style="
             background: rgba(59, 130, 246, 0.1);
@@ -1387,39 +1914,12 @@ def analytics_page():
     st.markdown('<h3 style="font-weight: 800; margin: 2rem 0 1.5rem 0;">📊 Overall Statistics</h3>',
                 unsafe_allow_html=True)
 
-    col1, col2, col3, col4 = st.columns(4)
-
-    with col1:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-value">{len(chapters_df)}</div>
-            <div class="metric-label">📚 Chapters</div>
-        </div>
-        """, unsafe_allow_html=True)
-    with col2:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-value">{len(all_attempts_df)}</div>
-            <div class="metric-label">✍️ Attempts</div>
-        </div>
-        """, unsafe_allow_html=True)
-    with col3:
-        unique_students = all_attempts_df['student_name'].nunique()
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-value">{unique_students}</div>
-            <div class="metric-label">👥 Students</div>
-        </div>
-        """, unsafe_allow_html=True)
-    with col4:
-        overall_avg = (
-            all_attempts_df['score'] / all_attempts_df['total_questions'] * 100).mean()
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-value">{overall_avg:.1f}%</div>
-            <div class="metric-label">📊 Avg Score</div>
-        </div>
-        """, unsafe_allow_html=True)
+    render_metric_cards([
+        (len(chapter_names), "📚 Chapters"),
+        (overall['total_attempts'], "✍️ Attempts"),
+        (overall['unique_students'], "👥 Students"),
+        (f"{overall['avg_percentage']:.1f}%", "📊 Avg Score"),
+    ])
 
     # Chapter-wise performance
     st.markdown('<h3 style="font-weight: 800; margin: 3rem 0 1.5rem 0;">📚 Chapter-wise Performance</h3>',
@@ -1427,24 +1927,9 @@ def analytics_page():
 
     st.markdown("""<div class="glass-card">""", unsafe_allow_html=True)
 
-    chapter_stats = all_attempts_df.groupby('chapter_name').agg({
-        'id': 'count',
-        'score': 'mean',
-        'total_questions': 'first',
-        'student_name': 'nunique'
-    }).reset_index()
-
-    chapter_stats.columns = ['Chapter', 'Total Attempts',
-                             'Avg Score', 'Total Questions', 'Unique Students']
-    chapter_stats['Avg Percentage'] = (
-        chapter_stats['Avg Score'] / chapter_stats['Total Questions'] * 100).round(2)
-
-    # Apply modern table styling
-    st.markdown(chapter_stats.to_html(
-        classes='table table-hover',
-        index=False,
-        escape=False
-    ), unsafe_allow_html=True)
+    chapter_stats, student_stats = db.get_performance_tables(attempts_version)
+
+    st.dataframe(chapter_stats, hide_index=True, use_container_width=True)
     
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -1458,25 +1943,7 @@ def analytics_page():
     st.markdown('<h3 class="fw-bold mt-4 mb-3">Top Performers</h3>',
                 unsafe_allow_html=True)
 
-    student_stats = all_attempts_df.groupby('student_name').agg({
-        'id': 'count',
-        'score': 'sum',
-        'total_questions': 'sum'
-    }).reset_index()
-
-    student_stats.columns = [
-        'Student', 'Total Attempts', 'Total Score', 'Total Questions']
-    student_stats['Percentage'] = (
-        student_stats['Total Score'] / student_stats['Total Questions'] * 100).round(2)
-    student_stats = student_stats.sort_values(
-        'Percentage', ascending=False).head(10)
-
-    # Apply Bootstrap table classes with striped rows
-    st.markdown(student_stats.to_html(
-        classes='table table-striped table-hover',
-        index=False,
-        escape=False
-    ), unsafe_allow_html=True)
+    st.dataframe(student_stats, hide_index=True, use_container_width=True)
 
 
 if __name__ == "__main__":
@@ -10,6 +10,13 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # Database settings
 DATABASE_NAME = 'omr_data.db'
 DATABASE_PATH = BASE_DIR / DATABASE_NAME
+DATABASE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-64000",
+)
 
 # Export settings
 EXPORT_DIR = BASE_DIR / 'exports'
@@ -32,6 +39,9 @@ INFO_COLOR = "#3b82f6"     # Blue
 SECONDARY_COLOR = "#ec4899"  # Pink
 ACCENT_COLOR = "#8b5cf6"    # Violet
 
+# Skip the st.balloons() animation after exams longer than this
+CELEBRATE_MAX_QUESTIONS = 50
+
 # Excel export settings
 EXCEL_ENGINE = 'xlsxwriter'
 
@@ -2,12 +2,13 @@
 Database manager for handling all database operations.
 """
 import sqlite3
+import threading
 from typing import List, Optional, Tuple
 import pandas as pd
 from contextlib import contextmanager
 
 from models import Chapter, Attempt
-from config import DATABASE_PATH
+from config import DATABASE_PATH, DATABASE_PRAGMAS
 
 
 class DatabaseManager:
@@ -32,6 +33,12 @@ class DatabaseManager:
         if self._initialized:
             return
         self.db_path = str(DATABASE_PATH)
+        # Each thread keeps its own open connection; see get_connection
+        self._local = threading.local()
+        # (version, DataFrame) of the last chapters read; see get_all_chapters
+        self._chapters_cache = None
+        # (version, {chapter_name: Chapter}) of chapters already parsed
+        self._chapter_objects = None
         self._initialized = True
         self.initialize_database()
 
@@ -40,18 +47,25 @@ class DatabaseManager:
         """
         Context manager for database connections.
 
+        The calling thread's connection is opened once and reused by every
+        call on that thread. Streamlit starts a new thread for each rerun,
+        so in the app this means one connection per script run.
+
         Yields:
             sqlite3.Connection: Database connection
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            for pragma in DATABASE_PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
         try:
             yield conn
             conn.commit()
         except Exception as e:
             conn.rollback()
             raise e
-        finally:
-            conn.close()
 
     def initialize_database(self):
         """Initialize the database with required tables."""
@@ -97,6 +111,26 @@ class DatabaseManager:
                 )
             ''')
 
+            # Indexes for the attempt lookups, history ordering and
+            # per-student aggregates. app.py opens the same file; its
+            # case-insensitive and keyset indexes use names of their own
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_attempts_chapter_student
+                ON attempts(chapter_id, student_name, submitted_at DESC)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_attempts_chapter
+                ON attempts(chapter_id, submitted_at DESC)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_attempts_submitted_at
+                ON attempts(submitted_at DESC)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_attempts_student
+                ON attempts(student_name, score, total_questions)
+            ''')
+
     # Subject operations
 
     def save_subject(self, subject_name: str, description: str = "") -> Tuple[bool, str]:
@@ -215,20 +249,38 @@ class DatabaseManager:
         except Exception as e:
             return False, f"Error saving chapter: {str(e)}"
 
+    @staticmethod
+    def _get_chapters_version(conn) -> tuple:
+        """Return (row count, highest id) of the chapters table."""
+        return conn.execute("SELECT COUNT(*), MAX(id) FROM chapters").fetchone()
+
     def get_all_chapters(self) -> pd.DataFrame:
         """
         Get all chapters from the database.
 
+        The table is only re-read when its row count or highest id has
+        changed since the last call, so page reruns skip the full query.
+        Answer keys are left out; get_chapter_by_name returns those.
+
         Returns:
-            DataFrame containing all chapters
+            DataFrame containing all chapters, without correct_answers
         """
         with self.get_connection() as conn:
-            return pd.read_sql_query("SELECT * FROM chapters", conn)
+            version = self._get_chapters_version(conn)
+            if self._chapters_cache is None or self._chapters_cache[0] != version:
+                self._chapters_cache = (
+                    version, pd.read_sql_query(
+                        "SELECT id, subject_id, chapter_name, num_questions, "
+                        "num_options, created_at FROM chapters", conn))
+        return self._chapters_cache[1].copy()
 
     def get_chapter_by_name(self, chapter_name: str) -> Optional[Chapter]:
         """
         Get a chapter by its name.
 
+        Parsed chapters are kept until the chapters table changes, so page
+        reruns do not re-read the row and re-parse its answer key.
+
         Args:
             chapter_name: Name of the chapter
 
@@ -236,14 +288,18 @@ class DatabaseManager:
             Chapter instance or None if not found
         """
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT * FROM chapters WHERE chapter_name = ?", (chapter_name,))
-            row = cursor.fetchone()
+            version = self._get_chapters_version(conn)
+            if self._chapter_objects is None or self._chapter_objects[0] != version:
+                self._chapter_objects = (version, {})
+            chapters = self._chapter_objects[1]
 
-            if row:
-                return Chapter.from_db_row(row)
-            return None
+            if chapter_name not in chapters:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT * FROM chapters WHERE chapter_name = ?", (chapter_name,))
+                row = cursor.fetchone()
+                chapters[chapter_name] = Chapter.from_db_row(row) if row else None
+            return chapters[chapter_name]
 
     def get_chapter_by_id(self, chapter_id: int) -> Optional[Chapter]:
         """
@@ -274,27 +330,42 @@ class DatabaseManager:
         Args:
             attempt: Attempt instance to save
 
+        Returns:
+            True if successful, False otherwise
+        """
+        return self.save_attempts_bulk([attempt])
+
+    def save_attempts_bulk(self, attempts: List[Attempt]) -> bool:
+        """
+        Save several attempts in a single transaction.
+
+        Either every attempt is stored or, on any error, none are.
+
+        Args:
+            attempts: Attempt instances to save
+
         Returns:
             True if successful, False otherwise
         """
         try:
             with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
+                # Take the write lock up front rather than on the first insert
+                conn.execute('BEGIN IMMEDIATE')
+                conn.executemany('''
                     INSERT INTO attempts 
                     (chapter_id, student_name, submitted_answers, score, total_questions, attempt_number)
                     VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
+                ''', [(
                     attempt.chapter_id,
                     attempt.student_name,
                     attempt.get_submitted_answers_json(),
                     attempt.score,
                     attempt.total_questions,
                     attempt.attempt_number
-                ))
+                ) for attempt in attempts])
                 return True
         except Exception as e:
-            print(f"Error saving attempt: {str(e)}")
+            print(f"Error saving attempts: {str(e)}")
             return False
 
     def get_attempt_count(self, chapter_id: int, student_name: str) -> int:
@@ -327,25 +398,17 @@ class DatabaseManager:
         Returns:
             DataFrame containing attempts
         """
+        student_name = student_name or None
         with self.get_connection() as conn:
-            if student_name:
-                query = '''
-                    SELECT a.*, c.chapter_name 
-                    FROM attempts a
-                    JOIN chapters c ON a.chapter_id = c.id
-                    WHERE c.chapter_name = ? AND a.student_name = ?
-                    ORDER BY a.submitted_at DESC
-                '''
-                return pd.read_sql_query(query, conn, params=(chapter_name, student_name))
-            else:
-                query = '''
-                    SELECT a.*, c.chapter_name 
-                    FROM attempts a
-                    JOIN chapters c ON a.chapter_id = c.id
-                    WHERE c.chapter_name = ?
-                    ORDER BY a.submitted_at DESC
-                '''
-                return pd.read_sql_query(query, conn, params=(chapter_name,))
+            query = '''
+                SELECT a.*, c.chapter_name 
+                FROM attempts a
+                JOIN chapters c ON a.chapter_id = c.id
+                WHERE c.chapter_name = ? AND (? IS NULL OR a.student_name = ?)
+                ORDER BY a.submitted_at DESC
+            '''
+            return pd.read_sql_query(
+                query, conn, params=(chapter_name, student_name, student_name))
 
     def get_all_attempts(self) -> pd.DataFrame:
         """
@@ -361,3 +424,73 @@ class DatabaseManager:
                 JOIN chapters c ON a.chapter_id = c.id
             '''
             return pd.read_sql_query(query, conn)
+
+    # Aggregate operations
+
+    def get_overall_statistics(self) -> dict:
+        """
+        Get headline totals across all attempts, aggregated in SQLite.
+
+        Returns:
+            Dictionary with total_chapters, total_attempts, unique_students
+            and avg_percentage (None when there are no attempts)
+        """
+        with self.get_connection() as conn:
+            row = conn.execute('''
+                SELECT (SELECT COUNT(*) FROM chapters),
+                       COUNT(*),
+                       COUNT(DISTINCT student_name),
+                       AVG(score * 100.0 / total_questions)
+                FROM attempts
+            ''').fetchone()
+        return dict(zip(
+            ('total_chapters', 'total_attempts', 'unique_students', 'avg_percentage'),
+            row))
+
+    def get_chapter_statistics(self) -> pd.DataFrame:
+        """
+        Get per-chapter attempt statistics, aggregated in SQLite.
+
+        Returns:
+            DataFrame with one row per attempted chapter
+        """
+        with self.get_connection() as conn:
+            query = '''
+                SELECT c.chapter_name AS "Chapter",
+                       COUNT(*) AS "Total Attempts",
+                       AVG(a.score) AS "Avg Score",
+                       MAX(a.total_questions) AS "Total Questions",
+                       COUNT(DISTINCT a.student_name) AS "Unique Students",
+                       ROUND(AVG(a.score) * 100.0 / MAX(a.total_questions), 2)
+                           AS "Avg Percentage"
+                FROM attempts a
+                JOIN chapters c ON a.chapter_id = c.id
+                GROUP BY c.chapter_name
+                ORDER BY c.chapter_name
+            '''
+            return pd.read_sql_query(query, conn)
+
+    def get_top_students(self, limit: int = 10) -> pd.DataFrame:
+        """
+        Get the students with the best overall percentage, aggregated in SQLite.
+
+        Args:
+            limit: Number of students to return
+
+        Returns:
+            DataFrame of the top students, best first
+        """
+        with self.get_connection() as conn:
+            query = '''
+                SELECT student_name AS "Student",
+                       COUNT(*) AS "Total Attempts",
+                       SUM(score) AS "Total Score",
+                       SUM(total_questions) AS "Total Questions",
+                       ROUND(SUM(score) * 100.0 / SUM(total_questions), 2)
+                           AS "Percentage"
+                FROM attempts
+                GROUP BY student_name
+                ORDER BY SUM(score) * 1.0 / SUM(total_questions) DESC
+                LIMIT ?
+            '''
+            return pd.read_sql_query(query, conn, params=(limit,))
@@ -0,0 +1,39 @@
+"""
+Storage format for answer lists shared by every reader of the database.
+"""
+import json
+from typing import List, Optional
+
+# Placeholder stored for an unanswered question in a packed answer string
+UNANSWERED = '-'
+
+
+def encode_answers(answers: List[Optional[str]]) -> str:
+    """
+    Pack a list of single-letter answers into one string for storage.
+
+    Args:
+        answers: List of option letters, None for unanswered questions
+
+    Returns:
+        String with one character per question
+    """
+    return ''.join(UNANSWERED if ans is None else ans for ans in answers)
+
+
+def decode_answers(stored: str) -> List[Optional[str]]:
+    """
+    Unpack a stored answer string back into a list of option letters.
+
+    Rows written before answers were packed, and rows written by the
+    JSON-storing front ends, hold a JSON list, which is decoded as such.
+
+    Args:
+        stored: Value of a correct_answers or submitted_answers column
+
+    Returns:
+        List of option letters, None for unanswered questions
+    """
+    if stored.startswith('['):
+        return json.loads(stored)
+    return [None if ans == UNANSWERED else ans for ans in stored]
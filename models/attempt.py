@@ -6,6 +6,8 @@ from typing import List, Optional
 from datetime import datetime
 import json
 
+from .answers import decode_answers
+
 
 @dataclass
 class Attempt:
@@ -77,7 +79,7 @@ class Attempt:
             Attempt instance
         """
         id_, chapter_id, student_name, submitted_answers_json, score, total_questions, attempt_number, submitted_at = row
-        submitted_answers = json.loads(submitted_answers_json)
+        submitted_answers = decode_answers(submitted_answers_json)
 
         return cls(
             id=id_,
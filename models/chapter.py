@@ -6,6 +6,8 @@ from typing import List, Optional
 from datetime import datetime
 import json
 
+from .answers import decode_answers
+
 
 @dataclass
 class Chapter:
@@ -64,7 +66,7 @@ class Chapter:
             Chapter instance
         """
         id_, chapter_name, num_questions, num_options, correct_answers_json, created_at = row
-        correct_answers = json.loads(correct_answers_json)
+        correct_answers = decode_answers(correct_answers_json)
 
         return cls(
             id=id_,
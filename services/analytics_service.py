@@ -23,25 +23,13 @@ class AnalyticsService:
         Returns:
             Dictionary containing overall statistics
         """
-        chapters_df = self.db_manager.get_all_chapters()
-        attempts_df = self.db_manager.get_all_attempts()
-
-        if attempts_df.empty:
-            return {
-                'total_chapters': len(chapters_df),
-                'total_attempts': 0,
-                'unique_students': 0,
-                'overall_avg_percentage': 0.0
-            }
-
-        overall_avg = (attempts_df['score'] /
-                       attempts_df['total_questions'] * 100).mean()
+        stats = self.db_manager.get_overall_statistics()
 
         return {
-            'total_chapters': len(chapters_df),
-            'total_attempts': len(attempts_df),
-            'unique_students': attempts_df['student_name'].nunique(),
-            'overall_avg_percentage': overall_avg
+            'total_chapters': stats['total_chapters'],
+            'total_attempts': stats['total_attempts'],
+            'unique_students': stats['unique_students'],
+            'overall_avg_percentage': stats['avg_percentage'] or 0.0
         }
 
     def get_chapter_statistics(self) -> pd.DataFrame:
@@ -51,31 +39,7 @@ class AnalyticsService:
         Returns:
             DataFrame with chapter-wise statistics
         """
-        attempts_df = self.db_manager.get_all_attempts()
-
-        if attempts_df.empty:
-            return pd.DataFrame()
-
-        chapter_stats = attempts_df.groupby('chapter_name').agg({
-            'id': 'count',
-            'score': 'mean',
-            'total_questions': 'first',
-            'student_name': 'nunique'
-        }).reset_index()
-
-        chapter_stats.columns = [
-            'Chapter',
-            'Total Attempts',
-            'Avg Score',
-            'Total Questions',
-            'Unique Students'
-        ]
-
-        chapter_stats['Avg Percentage'] = (
-            chapter_stats['Avg Score'] / chapter_stats['Total Questions'] * 100
-        ).round(2)
-
-        return chapter_stats
+        return self.db_manager.get_chapter_statistics()
 
     def get_top_performers(self, limit: int = 10) -> pd.DataFrame:
         """
@@ -87,30 +51,7 @@ class AnalyticsService:
         Returns:
             DataFrame with top performers
         """
-        attempts_df = self.db_manager.get_all_attempts()
-
-        if attempts_df.empty:
-            return pd.DataFrame()
-
-        student_stats = attempts_df.groupby('student_name').agg({
-            'id': 'count',
-            'score': 'sum',
-            'total_questions': 'sum'
-        }).reset_index()
-
-        student_stats.columns = [
-            'Student',
-            'Total Attempts',
-            'Total Score',
-            'Total Questions'
-        ]
-
-        student_stats['Percentage'] = (
-            student_stats['Total Score'] /
-            student_stats['Total Questions'] * 100
-        ).round(2)
-
-        return student_stats.sort_values('Percentage', ascending=False).head(limit)
+        return self.db_manager.get_top_students(limit)
 
     def get_attempt_summary_statistics(self, chapter_name: str) -> Dict[str, Any]:
         """
@@ -133,10 +74,14 @@ class AnalyticsService:
                 'unique_students': 0
             }
 
+        # Materialize each column once and derive every metric from it
+        score = attempts_df['score'].to_numpy(dtype=float)
+        total = attempts_df['total_questions'].to_numpy(dtype=float)
+
         return {
             'total_attempts': len(attempts_df),
-            'avg_score': attempts_df['score'].mean(),
-            'avg_total': attempts_df['total_questions'].mean(),
-            'avg_percentage': (attempts_df['score'] / attempts_df['total_questions'] * 100).mean(),
+            'avg_score': score.mean(),
+            'avg_total': total.mean(),
+            'avg_percentage': (score / total * 100).mean(),
             'unique_students': attempts_df['student_name'].nunique()
         }
@@ -2,6 +2,7 @@
 Attempt service for business logic related to student attempts.
 """
 from typing import List, Optional, Tuple
+import numpy as np
 import pandas as pd
 
 from models import Attempt, Chapter
@@ -32,8 +33,11 @@ class AttemptService:
         Returns:
             Number of correct answers
         """
-        return sum(1 for correct, submitted in zip(correct_answers, submitted_answers)
-                   if correct == submitted)
+        # Compare only the overlapping prefix, as zip() would
+        n = min(len(correct_answers), len(submitted_answers))
+        correct = np.asarray(correct_answers[:n], dtype=object)
+        submitted = np.asarray(submitted_answers[:n], dtype=object)
+        return int((correct == submitted).sum())
 
     def submit_attempt(
         self,
@@ -146,16 +150,13 @@ class AttemptService:
         Returns:
             DataFrame with answer comparison
         """
-        comparison_data = []
-        for i in range(len(submitted_answers)):
-            is_correct = submitted_answers[i] == correct_answers[i]
-            status_icon = "✅" if is_correct else "❌"
-            comparison_data.append({
-                "Question": f"Q.{i+1}",
-                "Your Answer": submitted_answers[i] if submitted_answers[i] else 'Not Answered',
-                "Correct Answer": correct_answers[i],
-                "Status": status_icon,
-                "IsCorrect": is_correct
-            })
-
-        return pd.DataFrame(comparison_data)
+        sub = np.asarray(submitted_answers, dtype=object)
+        cor = np.asarray(correct_answers, dtype=object)
+        is_correct = sub == cor
+        return pd.DataFrame({
+            "Question": np.char.add("Q.", np.arange(1, len(sub) + 1).astype(str)),
+            "Your Answer": np.where(sub.astype(bool), sub, 'Not Answered'),
+            "Correct Answer": cor,
+            "Status": np.where(is_correct, "✅", "❌"),
+            "IsCorrect": is_correct
+        })
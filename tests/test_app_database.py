@@ -0,0 +1,365 @@
+import unittest
+import os
+import shutil
+import tempfile
+import threading
+import app
+import database.db_manager as db_manager
+
+
+def open_layered_manager(path):
+    """Run the layered package's schema setup against a database file"""
+    original_path = db_manager.DATABASE_PATH
+    db_manager.DATABASE_PATH = path
+    db_manager.DatabaseManager._instance = None
+    try:
+        db_manager.DatabaseManager()._local.conn.close()
+    finally:
+        db_manager.DatabaseManager._instance = None
+        db_manager.DATABASE_PATH = original_path
+
+
+class DatabaseManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        # Every test gets its own database file, since connections are
+        # kept open for the lifetime of the thread
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = app.DatabaseManager(os.path.join(self.tmp_dir, 'test_omr.db'))
+        self.db.save_chapter('Algebra', 4, 4, ['A', 'B', 'C', 'D'])
+        self.chapter_id = self.db.get_chapter_by_name('Algebra').id
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_connection_is_reused_in_wal_mode(self):
+        """Test the same tuned connection is handed out on every call"""
+        with self.db._get_connection() as first:
+            pass
+        with self.db._get_connection() as second:
+            pass
+        self.assertIs(first, second)
+        mode = first.execute('PRAGMA journal_mode').fetchone()[0]
+        self.assertEqual(mode, 'wal')
+
+    def test_attempt_count_uses_index(self):
+        """Test counting a student's attempts seeks the composite index"""
+        with self.db._get_connection() as conn:
+            plan = conn.execute(
+                'EXPLAIN QUERY PLAN SELECT COUNT(*) FROM attempts '
+                'WHERE chapter_id = ? AND student_name = ? COLLATE NOCASE',
+                (self.chapter_id, 'Student1')).fetchall()
+        self.assertIn('idx_attempts_chapter_student_nocase', ' '.join(row[-1] for row in plan))
+
+    def test_history_and_student_totals_use_indexes(self):
+        """Test attempt history and per-student totals are served by indexes"""
+        with self.db._get_connection() as conn:
+            history = conn.execute(
+                'EXPLAIN QUERY PLAN SELECT a.*, c.chapter_name FROM attempts a '
+                'JOIN chapters c ON a.chapter_id = c.id '
+                'ORDER BY a.submitted_at DESC').fetchall()
+            totals = conn.execute(
+                'EXPLAIN QUERY PLAN SELECT student_name, COUNT(id), SUM(score), '
+                'SUM(total_questions) FROM attempts GROUP BY student_name').fetchall()
+        self.assertIn('idx_attempts_submitted_at_id', ' '.join(row[-1] for row in history))
+        self.assertIn('COVERING INDEX idx_attempts_student',
+                      ' '.join(row[-1] for row in totals))
+
+    def test_schema_created_once_per_path(self):
+        """Test constructing another manager for a known path skips init_db"""
+        calls = []
+        original = app.DatabaseManager.init_db
+        app.DatabaseManager.init_db = lambda manager: calls.append(manager)
+        try:
+            app.DatabaseManager(self.db.db_path)
+        finally:
+            app.DatabaseManager.init_db = original
+        self.assertEqual(calls, [])
+
+    def test_answers_stored_as_packed_string(self):
+        """Test answers round-trip through the one-letter-per-question encoding"""
+        self.assertEqual(self.db.get_chapter_by_name('Algebra').correct_answers, 'ABCD')
+        self.db.save_attempt(self.chapter_id, 'Student1', ['A', None, 'C', 'A'], 2, 4, 1)
+        stored = self.db.get_student_attempts('Algebra')['submitted_answers'].iloc[0]
+        self.assertEqual(stored, 'A-CA')
+        self.assertEqual(app.decode_answers(stored), ['A', None, 'C', 'A'])
+
+    def test_decode_legacy_json_answers(self):
+        """Test rows saved as JSON lists are still readable"""
+        self.assertEqual(app.decode_answers('["A", null, "C"]'), ['A', None, 'C'])
+
+    def test_compare_answers(self):
+        """Test packed and legacy answers give the same per-question result"""
+        mask, n_correct, n_wrong = app.compare_answers('A-CA', 'ABCD')
+        self.assertEqual(mask.tolist(), [True, False, True, False])
+        self.assertEqual((n_correct, n_wrong), (2, 2))
+        legacy = app.compare_answers('["A", null, "C", "A"]', 'ABCD')
+        self.assertEqual(legacy[0].tolist(), mask.tolist())
+
+    def test_compare_answers_of_different_lengths(self):
+        """Test only the questions both answer lists have are compared"""
+        mask, n_correct, n_wrong = app.compare_answers('A-C', 'ABCD')
+        self.assertEqual(mask.tolist(), [True, False, True])
+        self.assertEqual((n_correct, n_wrong), (2, 1))
+        legacy = app.compare_answers('["A", null, "C", "A", "B"]', 'ABCD')
+        self.assertEqual(legacy[0].tolist(), [True, False, True, False])
+
+    def test_student_filter_ignores_case_and_uses_index(self):
+        """Test the student filter runs in SQL, case-insensitively, on an index"""
+        self.db.save_attempt(self.chapter_id, 'Student1', ['A', 'B', 'C', 'D'], 4, 4, 1)
+        self.db.save_attempt(self.chapter_id, 'Student2', ['A', 'B', 'C', 'D'], 4, 4, 1)
+        attempts = self.db.get_student_attempts('Algebra', 'student1')
+        self.assertEqual(attempts['student_name'].tolist(), ['Student1'])
+        self.assertEqual(len(self.db.get_student_attempts('Algebra', '')), 2)
+        with self.db._get_connection() as conn:
+            plan = ' '.join(row[-1] for row in conn.execute(
+                'EXPLAIN QUERY PLAN SELECT * FROM attempts '
+                'WHERE chapter_id = ? AND (? IS NULL OR student_name = ? COLLATE NOCASE) '
+                'ORDER BY submitted_at DESC',
+                (self.chapter_id, 'student1', 'student1')).fetchall())
+        self.assertIn('idx_attempts_chapter', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_save_attempt(self):
+        """Test a single attempt is stored and counted"""
+        self.assertEqual(self.db.get_attempt_count(self.chapter_id, 'Student1'), 0)
+        self.assertTrue(self.db.save_attempt(
+            self.chapter_id, 'Student1', ['A', 'B', 'C', 'A'], 3, 4, 1))
+        self.assertEqual(self.db.get_attempt_count(self.chapter_id, 'Student1'), 1)
+
+    def test_save_attempt_with_count_numbers_attempts(self):
+        """Test each saved attempt gets the student's next attempt number"""
+        for expected in (1, 2, 3):
+            self.assertEqual(self.db.save_attempt_with_count(
+                self.chapter_id, 'Student1', ['A', 'B', 'C', 'D'], 4, 4), expected)
+        self.assertEqual(self.db.save_attempt_with_count(
+            self.chapter_id, 'Student2', ['A', 'B', 'C', 'D'], 4, 4), 1)
+        attempts = self.db.get_student_attempts('Algebra', 'Student1')
+        self.assertEqual(sorted(attempts['attempt_number'].tolist()), [1, 2, 3])
+
+    def test_attempt_numbering_ignores_case_like_the_listing(self):
+        """Test a name typed in another case continues the same attempt count"""
+        self.assertEqual(self.db.save_attempt_with_count(
+            self.chapter_id, 'Student1', ['A', 'B', 'C', 'D'], 4, 4), 1)
+        self.assertEqual(self.db.save_attempt_with_count(
+            self.chapter_id, 'student1', ['A', 'B', 'C', 'D'], 4, 4), 2)
+        self.assertEqual(self.db.get_attempt_count(self.chapter_id, 'STUDENT1'), 2)
+        attempts = self.db.get_student_attempts('Algebra', 'student1')
+        self.assertEqual(sorted(attempts['attempt_number'].tolist()), [1, 2])
+
+    def test_save_attempts_bulk(self):
+        """Test many attempts are stored in one call"""
+        rows = [(self.chapter_id, f'Student{i}', ['A', 'B', 'C', 'D'], 4, 4, 1)
+                for i in range(50)]
+        self.assertTrue(self.db.save_attempts_bulk(rows))
+        self.assertEqual(len(self.db.get_student_attempts('Algebra')), 50)
+
+    def test_saving_attempt_refreshes_cached_attempts(self):
+        """Test cached attempt lists are dropped when an attempt is saved"""
+        self.assertTrue(self.db.get_student_attempts('Algebra').empty)
+        self.db.save_attempt(self.chapter_id, 'Student1', ['A', 'B', 'C', 'D'], 4, 4, 1)
+        self.assertEqual(len(self.db.get_student_attempts('Algebra')), 1)
+        self.assertEqual(len(self.db.get_student_attempts('Algebra', 'Student1')), 1)
+
+    def test_attempts_carry_percentage(self):
+        """Test loaded attempts come with their percentage precomputed"""
+        self.db.save_attempt(self.chapter_id, 'Student1', ['A', 'B', 'C', 'A'], 3, 4, 1)
+        self.assertEqual(self.db.get_student_attempts('Algebra')['percentage'].tolist(), [75.0])
+        self.assertEqual(self.db.get_all_attempts()['percentage'].tolist(), [75.0])
+
+    def test_percentage_keeps_full_score_precision(self):
+        """Test fractional scores are not rounded before the percentage is taken"""
+        self.db.save_attempt(self.chapter_id, 'Student1', ['A', 'B', 'C', 'A'], 2.7, 4, 1)
+        attempts = self.db.get_student_attempts('Algebra')
+        self.assertEqual(attempts['score'].dtype, 'float64')
+        self.assertEqual(attempts['percentage'].tolist(), [2.7 / 4 * 100])
+
+    def test_saving_refreshes_cached_statistics(self):
+        """Test cached student and chapter statistics are dropped on writes"""
+        self.assertTrue(self.db.get_student_statistics().empty)
+        self.assertEqual(self.db.get_chapter_statistics()['total_attempts'].tolist(), [0])
+        self.db.save_attempt(self.chapter_id, 'Student1', ['A', 'B', 'C', 'D'], 4, 4, 1)
+        self.assertEqual(self.db.get_student_statistics()['total_attempts'].tolist(), [1])
+        self.db.save_chapter('Geometry', 4, 4, ['A', 'B', 'C', 'D'])
+        self.assertEqual(self.db.get_chapter_statistics()['total_attempts'].tolist(), [1, 0])
+
+    def test_student_statistics_rank_in_sql(self):
+        """Test student accuracy and rank come back from the statistics query"""
+        self.db.save_attempts_bulk([
+            (self.chapter_id, 'Student1', ['A', 'B', 'C', 'A'], 3, 4, 1),
+            (self.chapter_id, 'Student2', ['A', 'B', 'C', 'D'], 4, 4, 1),
+            (self.chapter_id, 'Student3', ['A', 'B', 'C', 'D'], 4, 4, 1),
+        ])
+        stats = self.db.get_student_statistics()
+        self.assertEqual(stats['rank'].tolist(), [1, 1, 3])
+        self.assertEqual(stats['accuracy'].tolist(), [1.0, 1.0, 0.75])
+
+    def test_chapter_statistics_match_attempts(self):
+        """Test the trigger-maintained chapter totals match a full aggregate"""
+        self.db.save_chapter('Geometry', 4, 4, ['A', 'B', 'C', 'D'])
+        self.db.save_attempts_bulk([
+            (self.chapter_id, 'Student1', ['A', 'B', 'C', 'A'], 3, 4, 1),
+            (self.chapter_id, 'Student1', ['A', 'A', 'C', 'A'], 2, 4, 2),
+            (self.chapter_id, 'Student2', ['A', 'B', 'C', 'D'], 4, 4, 1),
+        ])
+        expected = [['Algebra', 3, 3.0, 4.0, 2], ['Geometry', 0, None, None, 0]]
+        stats = self.db.get_chapter_statistics()
+        self.assertEqual(stats.astype(object).where(stats.notna(), None).values.tolist(), expected)
+        # A database created before the summary table is backfilled on init
+        with self.db._get_connection() as conn:
+            conn.execute('DROP TABLE chapter_stats')
+            conn.commit()
+        self.db.init_db()
+        self.db._load_chapter_statistics.clear()
+        stats = self.db.get_chapter_statistics()
+        self.assertEqual(stats.astype(object).where(stats.notna(), None).values.tolist(), expected)
+
+    def test_indexes_hold_when_layered_manager_shares_the_file(self):
+        """Test app.py's query plans do not depend on which app opened the file first"""
+        count_sql = ('EXPLAIN QUERY PLAN SELECT COUNT(*) FROM attempts '
+                     'WHERE chapter_id = ? AND student_name = ? COLLATE NOCASE')
+        history_sql = ('EXPLAIN QUERY PLAN SELECT a.*, c.chapter_name FROM attempts a '
+                       'JOIN chapters c ON a.chapter_id = c.id '
+                       'ORDER BY a.submitted_at DESC, a.id DESC')
+        for layered_first in (True, False):
+            path = os.path.join(self.tmp_dir, f'shared_{layered_first}.db')
+            if layered_first:
+                open_layered_manager(path)
+            db = app.DatabaseManager(path)
+            if not layered_first:
+                open_layered_manager(path)
+            with db._get_connection() as conn:
+                count_plan = ' '.join(row[-1] for row in conn.execute(count_sql, (1, 'bob')))
+                history_plan = ' '.join(row[-1] for row in conn.execute(history_sql))
+            self.assertIn('idx_attempts_chapter_student_nocase (chapter_id=? AND student_name=?)',
+                          count_plan)
+            self.assertIn('idx_attempts_submitted_at_id', history_plan)
+            self.assertNotIn('TEMP B-TREE', history_plan)
+
+    def test_chapter_statistics_count_students_ignoring_case(self):
+        """Test names differing only in case are one student, as in attempt numbering"""
+        self.db.save_attempt_with_count(self.chapter_id, 'Bob', ['A', 'B', 'C', 'D'], 4, 4)
+        self.assertEqual(self.db.save_attempt_with_count(
+            self.chapter_id, 'bob', ['A', 'B', 'C', 'D'], 4, 4), 2)
+        self.assertEqual(self.db.get_chapter_statistics().iloc[0, -1], 1)
+        # The backfill agrees with the trigger
+        with self.db._get_connection() as conn:
+            conn.execute('DROP TABLE chapter_stats')
+            conn.commit()
+        self.db.init_db()
+        self.db._load_chapter_statistics.clear()
+        self.assertEqual(self.db.get_chapter_statistics().iloc[0, -1], 1)
+
+    def test_init_db_leaves_web_app_schema_usable(self):
+        """Test init_db on a web_app.py database skips the chapter_stats triggers"""
+        path = os.path.join(self.tmp_dir, 'web_omr.db')
+        conn = app.sqlite3.connect(path)
+        conn.executescript('''
+            CREATE TABLE subjects (subject_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                   subject_name TEXT UNIQUE NOT NULL);
+            CREATE TABLE chapters (chapter_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                   subject_id INTEGER NOT NULL REFERENCES subjects (subject_id),
+                                   chapter_name TEXT UNIQUE NOT NULL, num_questions INTEGER NOT NULL,
+                                   num_options INTEGER NOT NULL, correct_answers TEXT NOT NULL,
+                                   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+            CREATE TABLE attempts (attempt_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                   chapter_id INTEGER NOT NULL REFERENCES chapters (chapter_id),
+                                   student_name TEXT NOT NULL, submitted_answers TEXT NOT NULL,
+                                   score REAL NOT NULL, total_questions INTEGER NOT NULL,
+                                   attempt_number INTEGER NOT NULL,
+                                   submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+        ''')
+        conn.close()
+        db = app.DatabaseManager(path)
+        with db._get_connection() as conn:
+            conn.execute("INSERT INTO subjects (subject_name) VALUES ('Maths')")
+            conn.execute("INSERT INTO chapters (subject_id, chapter_name, num_questions, "
+                         "num_options, correct_answers) VALUES (1, 'Algebra', 4, 4, '[]')")
+            conn.commit()
+            names = {row[0] for row in conn.execute('SELECT name FROM sqlite_master')}
+        self.assertNotIn('chapter_stats', names)
+        self.assertNotIn('trg_chapter_stats_chapter', names)
+
+    def test_all_attempts_follow_attempts_version(self):
+        """Test the cached all-attempts frame is reloaded when attempts change"""
+        before = self.db.get_attempts_version()
+        self.assertTrue(self.db.get_all_attempts().empty)
+        self.db.save_attempt(self.chapter_id, 'Student1', ['A', 'B', 'C', 'D'], 4, 4, 1)
+        self.assertNotEqual(self.db.get_attempts_version(), before)
+        self.assertEqual(len(self.db.get_all_attempts()), 1)
+
+    def test_all_attempts_newest_first(self):
+        """Test attempts are listed newest first, tied timestamps by id"""
+        with self.db._get_connection() as conn:
+            conn.executemany(
+                'INSERT INTO attempts (chapter_id, student_name, submitted_answers, score, '
+                'total_questions, attempt_number, submitted_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(self.chapter_id, f'Student{i}', 'ABCD', 4, 4, 1, f'2026-01-0{min(i, 3)} 00:00:00')
+                 for i in range(1, 6)])
+            conn.commit()
+        attempts = self.db.get_all_attempts()
+        self.assertEqual(attempts['student_name'].tolist(),
+                         ['Student5', 'Student4', 'Student3', 'Student2', 'Student1'])
+
+    def test_overall_statistics(self):
+        """Test headline totals are aggregated without loading attempts"""
+        self.db.save_attempts_bulk([
+            (self.chapter_id, 'Student1', ['A', 'B', 'C', 'A'], 3, 4, 1),
+            (self.chapter_id, 'Student1', ['A', 'A', 'C', 'A'], 2, 4, 2),
+            (self.chapter_id, 'Student2', ['A', 'B', 'C', 'D'], 4, 4, 1),
+        ])
+        self.assertEqual(self.db.get_overall_statistics(),
+                         {'total_attempts': 3, 'unique_students': 2, 'avg_percentage': 75.0})
+
+    def test_performance_tables_aggregate_in_sql(self):
+        """Test chapter and student tables match the per-attempt data"""
+        self.db.save_attempts_bulk([
+            (self.chapter_id, 'Student1', ['A', 'B', 'C', 'A'], 3, 4, 1),
+            (self.chapter_id, 'Student1', ['A', 'A', 'C', 'A'], 2, 4, 2),
+            (self.chapter_id, 'Student2', ['A', 'B', 'C', 'D'], 4, 4, 1),
+        ])
+        chapter_stats, student_stats = self.db.get_performance_tables()
+        self.assertEqual(chapter_stats.iloc[0].tolist(), ['Algebra', 3, 3.0, 4, 2, 75.0])
+        self.assertEqual(student_stats['Student'].tolist(), ['Student2', 'Student1'])
+        self.assertEqual(student_stats['Percentage'].tolist(), [100.0, 62.5])
+
+    def test_save_chapters_bulk(self):
+        """Test many chapters are saved together, or none on a duplicate"""
+        rows = [(f'Chapter{i}', 4, 4, ['A', 'B', 'C', 'D']) for i in range(10)]
+        self.assertEqual(self.db.save_chapters_bulk(rows),
+                         (True, "10 chapters saved successfully!"))
+        self.assertEqual(len(self.db.get_all_chapters()), 11)
+        success, _ = self.db.save_chapters_bulk(
+            [('Geometry', 4, 4, ['A', 'B', 'C', 'D']), ('Algebra', 4, 4, ['A', 'B', 'C', 'D'])])
+        self.assertFalse(success)
+        self.assertIsNone(self.db.get_chapter_by_name('Geometry'))
+
+    def test_chapter_names_refresh_after_save(self):
+        """Test the cached chapter name tuple picks up a newly saved chapter"""
+        self.assertEqual(self.db.get_chapter_names(), ('Algebra',))
+        self.db.save_chapter('Geometry', 4, 4, ['A', 'B', 'C', 'D'])
+        self.assertEqual(sorted(self.db.get_chapter_names()), ['Algebra', 'Geometry'])
+
+    def test_concurrent_writers_are_serialized(self):
+        """Test attempts saved from several threads at once all land"""
+        def save_batch(worker):
+            self.db.save_attempts_bulk(
+                [(self.chapter_id, f'Worker{worker}', ['A', 'B', 'C', 'D'], 4, 4, i)
+                 for i in range(1, 26)])
+        threads = [threading.Thread(target=save_batch, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.db.get_student_attempts('Algebra')), 100)
+
+    def test_save_attempts_bulk_is_atomic(self):
+        """Test a bad row rolls back the whole batch"""
+        rows = [(self.chapter_id, 'Student1', ['A', 'B', 'C', 'D'], 4, 4, 1),
+                (self.chapter_id, None, ['A', 'B', 'C', 'D'], 4, 4, 1)]
+        self.assertFalse(self.db.save_attempts_bulk(rows))
+        self.assertEqual(self.db.get_attempt_count(self.chapter_id, 'Student1'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
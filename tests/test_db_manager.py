@@ -0,0 +1,111 @@
+import unittest
+import shutil
+import tempfile
+from pathlib import Path
+
+import app
+import database.db_manager as db_manager
+from models import Attempt
+from services import AnalyticsService
+
+
+class LayeredDatabaseManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        # The manager is a singleton reading DATABASE_PATH on first use, so
+        # each test points it at a fresh file and builds a new instance
+        self.tmp_dir = tempfile.mkdtemp()
+        self.original_path = db_manager.DATABASE_PATH
+        db_manager.DATABASE_PATH = Path(self.tmp_dir) / 'test_omr.db'
+        db_manager.DatabaseManager._instance = None
+        self.db = db_manager.DatabaseManager()
+        with self.db.get_connection() as conn:
+            conn.execute("INSERT INTO subjects (subject_name) VALUES ('Maths')")
+            conn.execute("INSERT INTO chapters (subject_id, chapter_name, num_questions, "
+                         "num_options, correct_answers) VALUES (1, 'Algebra', 4, 4, 'ABCD')")
+        self.chapter_id = 1
+
+    def tearDown(self):
+        self.db._local.conn.close()
+        db_manager.DatabaseManager._instance = None
+        db_manager.DATABASE_PATH = self.original_path
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_save_attempts_bulk_is_atomic(self):
+        """Test a bad row rolls back the whole batch"""
+        good = Attempt(self.chapter_id, 'Student1', ['A', 'B', 'C', 'D'], 4, 4, 1)
+        bad = Attempt(self.chapter_id, None, ['A', 'B', 'C', 'D'], 4, 4, 1)
+        self.assertFalse(self.db.save_attempts_bulk([good, bad]))
+        self.assertEqual(self.db.get_attempt_count(self.chapter_id, 'Student1'), 0)
+        self.assertTrue(self.db.save_attempts_bulk([good]))
+        self.assertEqual(self.db.get_attempt_count(self.chapter_id, 'Student1'), 1)
+
+    def test_indexes_hold_when_app_opens_the_file_first(self):
+        """Test app.py's schema setup leaves the layered indexes as defined here"""
+        path = Path(self.tmp_dir) / 'shared_omr.db'
+        app.DatabaseManager(str(path))
+        self.db._local.conn.close()
+        db_manager.DATABASE_PATH = path
+        db_manager.DatabaseManager._instance = None
+        self.db = db_manager.DatabaseManager()
+        with self.db.get_connection() as conn:
+            count_plan = ' '.join(row[-1] for row in conn.execute(
+                'EXPLAIN QUERY PLAN SELECT COUNT(*) FROM attempts '
+                'WHERE chapter_id = ? AND student_name = ?', (1, 'Student1')))
+            history_index = conn.execute(
+                "SELECT sql FROM sqlite_master WHERE name = 'idx_attempts_submitted_at'"
+            ).fetchone()[0]
+        self.assertIn('idx_attempts_chapter_student (chapter_id=? AND student_name=?)',
+                      count_plan)
+        self.assertIn('ON attempts(submitted_at DESC)', history_index)
+
+    def _save_sample_attempts(self):
+        self.assertTrue(self.db.save_attempts_bulk([
+            Attempt(self.chapter_id, 'Student1', ['A', 'B', 'C', 'A'], 3, 4, 1),
+            Attempt(self.chapter_id, 'Student1', ['A', 'A', 'C', 'A'], 2, 4, 2),
+            Attempt(self.chapter_id, 'Student2', ['A', 'B', 'C', 'D'], 4, 4, 1),
+        ]))
+
+    def test_overall_statistics_without_attempts(self):
+        """Test the empty tables give no average rather than a zero division"""
+        stats = self.db.get_overall_statistics()
+        self.assertEqual(stats, {'total_chapters': 1, 'total_attempts': 0,
+                                 'unique_students': 0, 'avg_percentage': None})
+        self.assertEqual(AnalyticsService().get_overall_statistics()['overall_avg_percentage'], 0.0)
+        self.assertTrue(self.db.get_chapter_statistics().empty)
+        self.assertTrue(self.db.get_top_students().empty)
+
+    def test_overall_statistics(self):
+        """Test headline totals are aggregated across every attempt"""
+        self._save_sample_attempts()
+        stats = self.db.get_overall_statistics()
+        self.assertEqual((stats['total_chapters'], stats['total_attempts'],
+                          stats['unique_students']), (1, 3, 2))
+        self.assertAlmostEqual(stats['avg_percentage'], 75.0)
+
+    def test_chapter_statistics(self):
+        """Test per-chapter totals carry the columns the analytics page reads"""
+        with self.db.get_connection() as conn:
+            conn.execute("INSERT INTO chapters (subject_id, chapter_name, num_questions, "
+                         "num_options, correct_answers) VALUES (1, 'Geometry', 4, 4, 'ABCD')")
+        self._save_sample_attempts()
+        stats = AnalyticsService().get_chapter_statistics()
+        self.assertEqual(
+            stats[['Chapter', 'Total Attempts', 'Avg Percentage', 'Unique Students']]
+            .values.tolist(),
+            [['Algebra', 3, 75.0, 2]])
+        self.assertEqual(stats['Avg Score'].tolist(), [3.0])
+        self.assertEqual(stats['Total Questions'].tolist(), [4])
+
+    def test_top_students(self):
+        """Test students are ranked by overall percentage, best first"""
+        self._save_sample_attempts()
+        top = AnalyticsService().get_top_performers(limit=10)
+        self.assertEqual(top[['Student', 'Total Attempts', 'Total Score',
+                              'Total Questions', 'Percentage']].values.tolist(),
+                         [['Student2', 1, 4.0, 4, 100.0], ['Student1', 2, 5.0, 8, 62.5]])
+        self.assertEqual(self.db.get_top_students(limit=1)['Student'].tolist(), ['Student2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,24 @@
+import unittest
+from models import Attempt, Chapter
+from models.answers import encode_answers, decode_answers
+
+
+class AnswerStorageTest(unittest.TestCase):
+
+    def test_round_trip_packed_answers(self):
+        """Test packed answers decode back to the same list"""
+        answers = ['A', None, 'C', 'D']
+        self.assertEqual(encode_answers(answers), 'A-CD')
+        self.assertEqual(decode_answers(encode_answers(answers)), answers)
+
+    def test_models_read_both_storage_formats(self):
+        """Test the layered models accept packed and JSON answer columns"""
+        for stored in ('A-CD', '["A", null, "C", "D"]'):
+            chapter = Chapter.from_db_row((1, 'Algebra', 4, 4, stored, None))
+            attempt = Attempt.from_db_row((1, 1, 'Student1', stored, 3, 4, 1, None))
+            self.assertEqual(chapter.correct_answers, ['A', None, 'C', 'D'])
+            self.assertEqual(attempt.submitted_answers, ['A', None, 'C', 'D'])
+
+
+if __name__ == '__main__':
+    unittest.main()
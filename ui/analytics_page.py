@@ -21,27 +21,20 @@ class AnalyticsPageUI(BaseUI):
         self.render_header(
             "Platform Insights", "Monitor growth, success rates, and top performers in real-time.")
 
-        all_attempts = self.analytics_service.db_manager.get_all_attempts()
-        if all_attempts.empty:
+        stats = self.analytics_service.get_overall_statistics()
+        if stats['total_attempts'] == 0:
             self.render_alert(
                 "No analytical data found yet. Start taking tests to populate this view!", "info")
             return
 
         # Overall KPI Metrics
-        stats = self.analytics_service.get_overall_statistics()
 
-        m_col1, m_col2, m_col3, m_col4 = st.columns(4)
-        with m_col1:
-            self.render_metric_card(str(stats['total_chapters']), "Chapters")
-        with m_col2:
-            self.render_metric_card(
-                str(stats['total_attempts']), "Global Syncs")
-        with m_col3:
-            self.render_metric_card(
-                str(stats['unique_students']), "Total Users")
-        with m_col4:
-            self.render_metric_card(
-                f"{stats['overall_avg_percentage']:.1f}%", "Success Rate")
+        self.render_metric_cards([
+            (stats['total_chapters'], "Chapters"),
+            (stats['total_attempts'], "Global Syncs"),
+            (stats['unique_students'], "Total Users"),
+            (f"{stats['overall_avg_percentage']:.1f}%", "Success Rate"),
+        ])
 
         # Performance Breakdowns
         st.markdown('<div style="margin-top: 2rem;"></div>',
@@ -53,23 +46,17 @@ class AnalyticsPageUI(BaseUI):
             self.open_card("Chapter Efficiency Matrix")
             ch_stats = self.analytics_service.get_chapter_statistics()
 
-            html_rows = ""
-            for _, row in ch_stats.iterrows():
-                html_rows += f"""
-                <tr>
-                    <td><b>{row['chapter_name']}</b></td>
-                    <td>{row['Total Attempts']}</td>
-                    <td><span class="badge bg-primary" style="background: #e0f2fe !important; color: #0369a1 !important;">{row['Avg Percentage']:.1f}%</span></td>
-                    <td>{row['Unique Students']}</td>
-                </tr>
-                """
-
-            st.markdown(f"""
-            <table class="modern-table">
-                <thead><tr><th>Resource</th><th>Syncs</th><th>Avg %</th><th>Users</th></tr></thead>
-                <tbody>{html_rows}</tbody>
-            </table>
-            """, unsafe_allow_html=True)
+            # One row per chapter, so this grows with the catalogue; the
+            # grid only draws the rows in view
+            st.dataframe(
+                ch_stats[['Chapter', 'Total Attempts', 'Avg Percentage', 'Unique Students']],
+                hide_index=True, use_container_width=True,
+                column_config={
+                    'Chapter': 'Resource',
+                    'Total Attempts': 'Syncs',
+                    'Avg Percentage': st.column_config.NumberColumn('Avg %', format='%.1f%%'),
+                    'Unique Students': 'Users'
+                })
             self.close_card()
 
         with col_right:
@@ -83,7 +70,7 @@ class AnalyticsPageUI(BaseUI):
                 html_rows += f"""
                 <tr>
                     <td style="font-size: 1.1rem;">{medal}</td>
-                    <td><b>{row['student_name']}</b></td>
+                    <td><b>{row['Student']}</b></td>
                     <td style="color: var(--primary); font-weight: 600;">{row['Percentage']:.1f}%</td>
                 </tr>
                 """
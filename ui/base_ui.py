@@ -45,6 +45,18 @@ class BaseUI(ABC):
         </div>
         """, unsafe_allow_html=True)
 
+    def render_metric_cards(self, cards: list):
+        """
+        Render a row of metric cards as one CSS grid in a single markdown call.
+        """
+        html = "".join(
+            f'<div class="metric-container"><div class="metric-val">{value}</div>'
+            f'<div class="metric-lbl">{label}</div></div>'
+            for value, label in cards)
+        st.markdown(
+            f'<div style="display: grid; grid-template-columns: repeat({len(cards)}, 1fr); '
+            f'gap: 1rem;">{html}</div>', unsafe_allow_html=True)
+
     def render_alert(self, message: str, alert_type: str = "info"):
         """
         Render a clean modern alert.
@@ -8,7 +8,7 @@ from typing import Tuple
 from ui.base_ui import BaseUI
 from services import ChapterService, AttemptService
 from utils import OptionHelper, ExcelExporter, FilterHelper
-from config import FILE_DATE_FORMAT
+from config import FILE_DATE_FORMAT, CELEBRATE_MAX_QUESTIONS
 
 
 class ExamPageUI(BaseUI):
@@ -109,12 +109,18 @@ class ExamPageUI(BaseUI):
 
         # Answer Sheet Grid
         self.open_card(f"Answer Sheet — {chapter_name}")
-        submitted_answers = self._render_grid_answer_sheet(chapter)
+        # Radios live in a form, so picking answers does not rerun the page;
+        # the script only runs again on submit
+        with st.form("omr_form", border=False):
+            submitted_answers = self._render_grid_answer_sheet(chapter)
 
-        st.markdown('<div style="margin-top: 2rem;"></div>',
-                    unsafe_allow_html=True)
+            st.markdown('<div style="margin-top: 2rem;"></div>',
+                        unsafe_allow_html=True)
+
+            submitted = st.form_submit_button(
+                "🚀 Submit Examination", use_container_width=True, type="primary")
 
-        if st.button("🚀 Submit Examination", use_container_width=True, type="primary"):
+        if submitted:
             self._process_submission(student_name, chapter, submitted_answers)
         self.close_card()
 
@@ -125,24 +131,22 @@ class ExamPageUI(BaseUI):
                     f'ℹ️ Total Questions: <b>{chapter.num_questions}</b> | Available Options: <b>{", ".join(option_letters)}</b>'
                     f'</div>', unsafe_allow_html=True)
 
-        submitted_answers = []
+        submitted_answers = [None] * chapter.num_questions
         # Use 3 columns for a more compact layout
         cols = st.columns(3)
 
         for i in range(chapter.num_questions):
             col_idx = i % 3  # Distribute questions across 3 columns
             with cols[col_idx]:
-                ans = st.radio(
+                submitted_answers[i] = st.radio(
                     f"Question {i+1}",
                     options=option_letters,
                     horizontal=True,
                     index=None,
                     key=f"ans_react_{i}"
                 )
-                submitted_answers.append((i, ans))
 
-        submitted_answers.sort(key=lambda x: x[0])
-        return [ans for idx, ans in submitted_answers]
+        return submitted_answers
 
     def _process_submission(self, student_name, chapter, submitted_answers):
         success, attempt, message = self.attempt_service.submit_attempt(
@@ -153,7 +157,8 @@ class ExamPageUI(BaseUI):
             st.error(f"Error: {message}")
             return
 
-        st.balloons()
+        if chapter.num_questions <= CELEBRATE_MAX_QUESTIONS:
+            st.balloons()
         self.render_alert(
             "Test submitted successfully! View your performance below.", "success")
 
@@ -162,15 +167,11 @@ class ExamPageUI(BaseUI):
                     unsafe_allow_html=True)
         self.render_header("Performance Summary")
 
-        m_col1, m_col2, m_col3 = st.columns(3)
-        with m_col1:
-            self.render_metric_card(
-                f"{attempt.score}/{attempt.total_questions}", "Total Score")
-        with m_col2:
-            self.render_metric_card(
-                f"{attempt.calculate_percentage():.1f}%", "Percentage")
-        with m_col3:
-            self.render_metric_card(str(attempt.attempt_number), "Attempt No.")
+        self.render_metric_cards([
+            (f"{attempt.score}/{attempt.total_questions}", "Total Score"),
+            (f"{attempt.calculate_percentage():.1f}%", "Percentage"),
+            (attempt.attempt_number, "Attempt No."),
+        ])
 
         # Detailed Comparison
         st.markdown('<div style="margin-top: 2rem;"></div>',
@@ -191,18 +192,16 @@ class ExamPageUI(BaseUI):
         df_filtered = FilterHelper.filter_comparison_data(df_comp, f_opt)
 
         # HTML Table for custom styling
-        html_rows = ""
-        for _, row in df_filtered.iterrows():
-            status_class = "status-success" if row['Status'] == '✅' else "status-error"
-            row_html = f"""
+        rows = zip(*(df_filtered[col].to_numpy() for col in
+                     ('Question', 'Your Answer', 'Correct Answer', 'Status')))
+        html_rows = "".join(f"""
             <tr>
-                <td><b>Q{row['Question']}</b></td>
-                <td><span class="badge bg-secondary">{row['Your Answer'] or 'Empty'}</span></td>
-                <td><span class="badge bg-primary">{row['Correct Answer']}</span></td>
-                <td><span class="status-badge {status_class}">{row['Status']}</span></td>
+                <td><b>Q{question}</b></td>
+                <td><span class="badge bg-secondary">{your_answer or 'Empty'}</span></td>
+                <td><span class="badge bg-primary">{correct_answer}</span></td>
+                <td><span class="status-badge {'status-success' if status == '✅' else 'status-error'}">{status}</span></td>
             </tr>
-            """
-            html_rows += row_html
+            """ for question, your_answer, correct_answer, status in rows)
 
         st.markdown(f"""
         <table class="modern-table">
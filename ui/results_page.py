@@ -2,11 +2,11 @@
 Results Page - React Design Suite (Updated Layout)
 """
 import streamlit as st
-import json
 
 from ui.base_ui import BaseUI
 from services import ChapterService, AttemptService, AnalyticsService
 from utils import ExcelExporter, FilterHelper
+from models.answers import decode_answers
 
 
 class ResultsPageUI(BaseUI):
@@ -47,10 +47,13 @@ class ResultsPageUI(BaseUI):
 
         with col2:
             if not attempts_df.empty:
+                # Label options from plain arrays, not a row lookup per option
+                student_names = attempts_df['student_name'].to_numpy()
+                attempt_numbers = attempts_df['attempt_number'].to_numpy()
                 idx = st.selectbox(
                     "Select Attempt / Student",
                     options=range(len(attempts_df)),
-                    format_func=lambda x: f"{attempts_df.iloc[x]['student_name']} — ver.{attempts_df.iloc[x]['attempt_number']}",
+                    format_func=lambda x: f"{student_names[x]} — ver.{attempt_numbers[x]}",
                     key="results_direct_inspect"
                 )
             else:
@@ -67,16 +70,12 @@ class ResultsPageUI(BaseUI):
         stats = self.analytics_service.get_attempt_summary_statistics(
             chapter_name)
 
-        s_col1, s_col2, s_col3, s_col4 = st.columns(4)
-        with s_col1:
-            self.render_metric_card(str(stats['total_attempts']), "Syncs")
-        with s_col2:
-            self.render_metric_card(f"{stats['avg_score']:.1f}", "Avg")
-        with s_col3:
-            self.render_metric_card(
-                f"{stats['avg_percentage']:.1f}%", "Success")
-        with s_col4:
-            self.render_metric_card(str(stats['unique_students']), "Users")
+        self.render_metric_cards([
+            (stats['total_attempts'], "Syncs"),
+            (f"{stats['avg_score']:.1f}", "Avg"),
+            (f"{stats['avg_percentage']:.1f}%", "Success"),
+            (stats['unique_students'], "Users"),
+        ])
 
         # Detailed Inspection of the SELECTED ATTEMPT
         st.markdown('<div style="margin-top: 2rem;"></div>',
@@ -88,16 +87,13 @@ class ResultsPageUI(BaseUI):
         self.open_card(
             f"Inspection: {att['student_name']} (Attempt #{att['attempt_number']})")
 
-        submitted_answers = json.loads(att['submitted_answers'])
+        submitted_answers = decode_answers(att['submitted_answers'])
         chapter = self.chapter_service.get_chapter_by_name(chapter_name)
         
-        # Parse correct answers if it's a JSON string
+        # Parse correct answers if they are still in their stored form
         correct_answers = chapter.correct_answers
         if isinstance(correct_answers, str):
-            try:
-                correct_answers = json.loads(correct_answers)
-            except (json.JSONDecodeError, TypeError):
-                correct_answers = correct_answers
+            correct_answers = decode_answers(correct_answers)
 
         st.markdown(
             f'<p style="color: var(--text-muted); font-size: 0.85rem; margin-bottom: 20px;">🗓️ Submitted on: {att["submitted_at"]}</p>', unsafe_allow_html=True)
@@ -114,47 +110,37 @@ class ResultsPageUI(BaseUI):
             submitted_answers, correct_answers)
         df_filtered = FilterHelper.filter_comparison_data(df_comp, f_opt)
 
-        html_rows = ""
-        for _, row in df_filtered.iterrows():
-            status_class = "status-success" if row['Status'] == '✅' else "status-error"
-            html_rows += f"""
-            <tr>
-                <td><b>Q{row['Question']}</b></td>
-                <td><span class="badge bg-secondary">{row['Your Answer'] or 'Empty'}</span></td>
-                <td><span class="badge bg-primary">{row['Correct Answer']}</span></td>
-                <td><span class="status-badge {status_class}">{row['Status']}</span></td>
-            </tr>
-            """
-
-        st.markdown(f"""
-        <table class="modern-table">
-            <thead>
-                <tr><th>ID</th><th>Entry</th><th>Key</th><th>Status</th></tr>
-            </thead>
-            <tbody>{html_rows}</tbody>
-        </table>
-        """, unsafe_allow_html=True)
+        # The grid only draws the rows in view, however long the test
+        st.dataframe(df_filtered.drop(columns='IsCorrect'),
+                     hide_index=True, use_container_width=True)
 
         # Action Bar
         st.markdown('<div style="margin-top: 1.5rem;"></div>',
                     unsafe_allow_html=True)
-        excel_data = ExcelExporter.create_exam_report(
-            student_name=att['student_name'],
-            chapter_name=chapter_name,
-            score=att['score'],
-            total_questions=att['total_questions'],
-            percentage=(att['score']/att['total_questions']*100),
-            attempt_number=att['attempt_number'],
-            submitted_answers=submitted_answers,
-            correct_answers=correct_answers,
-            submitted_at=att['submitted_at']
-        )
-
-        st.download_button(
-            label=f"📥 Download Full Report for {att['student_name']}",
-            data=excel_data,
-            file_name=f"{att['student_name']}_{chapter_name}_v{att['attempt_number']}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            use_container_width=True
-        )
+        # Build the workbook only when asked for, and keep the bytes in
+        # session state so filter clicks and other reruns reuse them
+        report_key = f"excel_report_{att['id']}"
+        if report_key not in st.session_state:
+            if st.button("📄 Prepare Excel Report", use_container_width=True,
+                         key=f"prepare_report_{att['id']}"):
+                st.session_state[report_key] = ExcelExporter.create_exam_report(
+                    student_name=att['student_name'],
+                    chapter_name=chapter_name,
+                    score=att['score'],
+                    total_questions=att['total_questions'],
+                    percentage=(att['score']/att['total_questions']*100),
+                    attempt_number=att['attempt_number'],
+                    submitted_answers=submitted_answers,
+                    correct_answers=correct_answers,
+                    submitted_at=att['submitted_at']
+                )
+
+        if report_key in st.session_state:
+            st.download_button(
+                label=f"📥 Download Full Report for {att['student_name']}",
+                data=st.session_state[report_key],
+                file_name=f"{att['student_name']}_{chapter_name}_v{att['attempt_number']}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                use_container_width=True
+            )
         self.close_card()
@@ -4,6 +4,7 @@ Excel export utilities for generating reports.
 from typing import List
 from io import BytesIO
 from datetime import datetime
+import numpy as np
 import pandas as pd
 
 from config import EXCEL_ENGINE, PRIMARY_COLOR
@@ -14,6 +15,22 @@ class ExcelExporter:
     Utility class for exporting data to Excel format.
     """
 
+    # Cell formats used by every report, registered once per workbook
+    FORMAT_SPECS = {
+        'header': {
+            'bold': True,
+            'bg_color': PRIMARY_COLOR,
+            'font_color': 'white',
+            'border': 1,
+            'align': 'center',
+            'valign': 'vcenter'
+        },
+        'correct': {'bg_color': '#d4edda', 'border': 1},
+        'incorrect': {'bg_color': '#f8d7da', 'border': 1},
+        'summary': {'bold': True, 'border': 1},
+        'cell': {'border': 1, 'align': 'center'}
+    }
+
     @staticmethod
     def create_exam_report(
         student_name: str,
@@ -24,7 +41,8 @@ class ExcelExporter:
         attempt_number: int,
         submitted_answers: List[str],
         correct_answers: List[str],
-        submitted_at: str = None
+        submitted_at: str = None,
+        constant_memory: bool = False
     ) -> bytes:
         """
         Create a comprehensive Excel report for an exam attempt.
@@ -39,13 +57,21 @@ class ExcelExporter:
             submitted_answers: List of submitted answers
             correct_answers: List of correct answers
             submitted_at: Timestamp of submission
+            constant_memory: Flush each row as it is written instead of
+                keeping the whole workbook in memory (for very long tests)
 
         Returns:
             Excel file as bytes
         """
         output = BytesIO()
 
-        with pd.ExcelWriter(output, engine=EXCEL_ENGINE) as writer:
+        # Every sheet is written strictly top to bottom, as constant_memory requires
+        options = {'constant_memory': True} if constant_memory else {'in_memory': True}
+        # Shown on both the summary and analysis sheets
+        percentage_text = f"{percentage:.2f}%"
+
+        with pd.ExcelWriter(output, engine=EXCEL_ENGINE,
+                            engine_kwargs={'options': options}) as writer:
             workbook = writer.book
 
             # Define formats
@@ -54,7 +80,7 @@ class ExcelExporter:
             # Create sheets
             ExcelExporter._create_summary_sheet(
                 writer, formats, student_name, chapter_name, score,
-                total_questions, percentage, attempt_number, submitted_at
+                total_questions, percentage_text, attempt_number, submitted_at
             )
 
             ExcelExporter._create_comparison_sheet(
@@ -62,7 +88,7 @@ class ExcelExporter:
             )
 
             ExcelExporter._create_analysis_sheet(
-                writer, formats, score, total_questions, percentage, submitted_answers
+                writer, formats, score, total_questions, percentage_text, submitted_answers
             )
 
             ExcelExporter._create_detail_sheet(
@@ -74,37 +100,35 @@ class ExcelExporter:
     @staticmethod
     def _create_formats(workbook):
         """Create Excel cell formats."""
-        return {
-            'header': workbook.add_format({
-                'bold': True,
-                'bg_color': PRIMARY_COLOR,
-                'font_color': 'white',
-                'border': 1,
-                'align': 'center',
-                'valign': 'vcenter'
-            }),
-            'correct': workbook.add_format({
-                'bg_color': '#d4edda',
-                'border': 1
-            }),
-            'incorrect': workbook.add_format({
-                'bg_color': '#f8d7da',
-                'border': 1
-            }),
-            'summary': workbook.add_format({
-                'bold': True,
-                'border': 1
-            }),
-            'cell': workbook.add_format({
-                'border': 1,
-                'align': 'center'
-            })
-        }
+        return {name: workbook.add_format(spec)
+                for name, spec in ExcelExporter.FORMAT_SPECS.items()}
+
+    @staticmethod
+    def _write_table(sheet, columns, header_format, cell_format):
+        """Write a {header: values} table to a worksheet, one write_row call per row."""
+        sheet.write_row(0, 0, list(columns), header_format)
+        values = [col.tolist() if isinstance(col, np.ndarray) else col
+                  for col in columns.values()]
+        for row_num, row in enumerate(zip(*values), start=1):
+            sheet.write_row(row_num, 0, row, cell_format)
+
+    @staticmethod
+    def _highlight_column(sheet, col, num_rows, match_value,
+                          correct_format, incorrect_format):
+        """Colour a data column by whether each cell equals match_value."""
+        sheet.conditional_format(1, col, num_rows, col, {
+            'type': 'cell', 'criteria': '==', 'value': match_value,
+            'format': correct_format
+        })
+        sheet.conditional_format(1, col, num_rows, col, {
+            'type': 'cell', 'criteria': '!=', 'value': match_value,
+            'format': incorrect_format
+        })
 
     @staticmethod
     def _create_summary_sheet(
         writer, formats, student_name, chapter_name, score,
-        total_questions, percentage, attempt_number, submitted_at
+        total_questions, percentage_text, attempt_number, submitted_at
     ):
         """Create exam summary sheet."""
         summary_data = {
@@ -123,76 +147,50 @@ class ExcelExporter:
                 submitted_at if submitted_at else datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 f"{score}/{total_questions}",
                 total_questions,
-                f"{percentage:.2f}%",
+                percentage_text,
                 attempt_number
             ]
         }
 
-        summary_df = pd.DataFrame(summary_data)
-        summary_df.to_excel(writer, sheet_name='Exam Summary', index=False)
-
-        summary_sheet = writer.sheets['Exam Summary']
+        summary_sheet = writer.book.add_worksheet('Exam Summary')
         summary_sheet.set_column('A:A', 20)
         summary_sheet.set_column('B:B', 30)
-
-        # Apply formatting
-        for col_num, value in enumerate(summary_df.columns.values):
-            summary_sheet.write(0, col_num, value, formats['header'])
-
-        for row_num in range(1, len(summary_df) + 1):
-            for col_num in range(len(summary_df.columns)):
-                summary_sheet.write(
-                    row_num, col_num,
-                    summary_df.iloc[row_num-1, col_num],
-                    formats['cell']
-                )
+        ExcelExporter._write_table(
+            summary_sheet, summary_data, formats['header'], formats['cell'])
 
     @staticmethod
     def _create_comparison_sheet(writer, formats, submitted_answers, correct_answers):
         """Create answer comparison sheet."""
-        comparison_data = []
-        for i in range(len(submitted_answers)):
-            is_correct = submitted_answers[i] == correct_answers[i]
-            comparison_data.append({
-                'Question No.': i + 1,
-                'Your Answer': submitted_answers[i] if submitted_answers[i] else 'Not Answered',
-                'Correct Answer': correct_answers[i],
-                'Status': 'Correct' if is_correct else 'Incorrect',
-                'Remarks': '✓' if is_correct else '✗'
-            })
-
-        comparison_df = pd.DataFrame(comparison_data)
-        comparison_df.to_excel(
-            writer, sheet_name='Answer Comparison', index=False)
+        sub = np.asarray(submitted_answers, dtype=object)
+        cor = np.asarray(correct_answers, dtype=object)
+        is_correct = sub == cor
+        comparison_data = {
+            'Question No.': np.arange(1, len(sub) + 1),
+            'Your Answer': np.where(sub.astype(bool), sub, 'Not Answered'),
+            'Correct Answer': cor,
+            'Status': np.where(is_correct, 'Correct', 'Incorrect'),
+            'Remarks': np.where(is_correct, '✓', '✗')
+        }
 
-        comparison_sheet = writer.sheets['Answer Comparison']
+        comparison_sheet = writer.book.add_worksheet('Answer Comparison')
         comparison_sheet.set_column('A:A', 15)
         comparison_sheet.set_column('B:B', 15)
         comparison_sheet.set_column('C:C', 15)
         comparison_sheet.set_column('D:D', 12)
         comparison_sheet.set_column('E:E', 10)
 
-        # Apply formatting
-        for col_num, value in enumerate(comparison_df.columns.values):
-            comparison_sheet.write(0, col_num, value, formats['header'])
+        ExcelExporter._write_table(
+            comparison_sheet, comparison_data, formats['header'], formats['cell'])
 
-        for row_num in range(1, len(comparison_df) + 1):
-            for col_num in range(len(comparison_df.columns)):
-                cell_value = comparison_df.iloc[row_num-1, col_num]
-
-                if col_num in [3, 4]:  # Status and Remarks columns
-                    if cell_value in ['Correct', '✓']:
-                        comparison_sheet.write(
-                            row_num, col_num, cell_value, formats['correct'])
-                    else:
-                        comparison_sheet.write(
-                            row_num, col_num, cell_value, formats['incorrect'])
-                else:
-                    comparison_sheet.write(
-                        row_num, col_num, cell_value, formats['cell'])
+        # Colour Status and Remarks by correctness
+        num_rows = len(sub)
+        ExcelExporter._highlight_column(comparison_sheet, 3, num_rows, '"Correct"',
+                                        formats['correct'], formats['incorrect'])
+        ExcelExporter._highlight_column(comparison_sheet, 4, num_rows, '"✓"',
+                                        formats['correct'], formats['incorrect'])
 
     @staticmethod
-    def _create_analysis_sheet(writer, formats, score, total_questions, percentage, submitted_answers):
+    def _create_analysis_sheet(writer, formats, score, total_questions, percentage_text, submitted_answers):
         """Create performance analysis sheet."""
         analysis_data = {
             'Metric': [
@@ -208,53 +206,40 @@ class ExcelExporter:
                 total_questions,
                 score,
                 total_questions - score,
-                sum(1 for ans in submitted_answers if ans is None),
+                submitted_answers.count(None),
                 f"{score}/{total_questions}",
-                f"{percentage:.2f}%",
-                f"{(score/total_questions*100):.2f}%"
+                percentage_text,
+                percentage_text
             ]
         }
 
-        analysis_df = pd.DataFrame(analysis_data)
-        analysis_df.to_excel(
-            writer, sheet_name='Performance Analysis', index=False)
-
-        analysis_sheet = writer.sheets['Performance Analysis']
+        analysis_sheet = writer.book.add_worksheet('Performance Analysis')
         analysis_sheet.set_column('A:A', 25)
         analysis_sheet.set_column('B:B', 20)
+        analysis_sheet.write_row(0, 0, list(analysis_data), formats['header'])
 
-        # Apply formatting
-        for col_num, value in enumerate(analysis_df.columns.values):
-            analysis_sheet.write(0, col_num, value, formats['header'])
-
-        for row_num in range(1, len(analysis_df) + 1):
-            for col_num in range(len(analysis_df.columns)):
-                fmt = formats['summary'] if col_num == 0 else formats['cell']
-                analysis_sheet.write(
-                    row_num, col_num,
-                    analysis_df.iloc[row_num-1, col_num],
-                    fmt
-                )
+        # Metric names in bold, values centred
+        for row_num, (metric, value) in enumerate(
+                zip(analysis_data['Metric'], analysis_data['Value']), start=1):
+            analysis_sheet.write(row_num, 0, metric, formats['summary'])
+            analysis_sheet.write(row_num, 1, value, formats['cell'])
 
     @staticmethod
     def _create_detail_sheet(writer, formats, submitted_answers, correct_answers):
         """Create question-wise detail sheet."""
-        detail_data = []
-        for i in range(len(submitted_answers)):
-            is_correct = submitted_answers[i] == correct_answers[i]
-            detail_data.append({
-                'Q.No': i + 1,
-                'Your Answer': submitted_answers[i] if submitted_answers[i] else 'N/A',
-                'Correct Answer': correct_answers[i],
-                'Is Correct': 'Yes' if is_correct else 'No',
-                'Points': 1 if is_correct else 0,
-                'Feedback': 'Well done!' if is_correct else 'Review this topic'
-            })
-
-        detail_df = pd.DataFrame(detail_data)
-        detail_df.to_excel(writer, sheet_name='Question Details', index=False)
+        sub = np.asarray(submitted_answers, dtype=object)
+        cor = np.asarray(correct_answers, dtype=object)
+        is_correct = sub == cor
+        detail_data = {
+            'Q.No': np.arange(1, len(sub) + 1),
+            'Your Answer': np.where(sub.astype(bool), sub, 'N/A'),
+            'Correct Answer': cor,
+            'Is Correct': np.where(is_correct, 'Yes', 'No'),
+            'Points': is_correct.astype(int),
+            'Feedback': np.where(is_correct, 'Well done!', 'Review this topic')
+        }
 
-        detail_sheet = writer.sheets['Question Details']
+        detail_sheet = writer.book.add_worksheet('Question Details')
         detail_sheet.set_column('A:A', 8)
         detail_sheet.set_column('B:B', 12)
         detail_sheet.set_column('C:C', 12)
@@ -262,21 +247,12 @@ class ExcelExporter:
         detail_sheet.set_column('E:E', 8)
         detail_sheet.set_column('F:F', 25)
 
-        # Apply formatting
-        for col_num, value in enumerate(detail_df.columns.values):
-            detail_sheet.write(0, col_num, value, formats['header'])
-
-        for row_num in range(1, len(detail_df) + 1):
-            for col_num in range(len(detail_df.columns)):
-                cell_value = detail_df.iloc[row_num-1, col_num]
+        ExcelExporter._write_table(
+            detail_sheet, detail_data, formats['header'], formats['cell'])
 
-                if col_num in [3, 4]:  # Is Correct and Points columns
-                    if cell_value in ['Yes', 1]:
-                        detail_sheet.write(
-                            row_num, col_num, cell_value, formats['correct'])
-                    else:
-                        detail_sheet.write(
-                            row_num, col_num, cell_value, formats['incorrect'])
-                else:
-                    detail_sheet.write(
-                        row_num, col_num, cell_value, formats['cell'])
+        # Colour Is Correct and Points by correctness
+        num_rows = len(sub)
+        ExcelExporter._highlight_column(detail_sheet, 3, num_rows, '"Yes"',
+                                        formats['correct'], formats['incorrect'])
+        ExcelExporter._highlight_column(detail_sheet, 4, num_rows, 1,
+                                        formats['correct'], formats['incorrect'])
@@ -1,7 +1,8 @@
 """
 Helper utilities for common operations.
 """
-from typing import List
+from functools import lru_cache
+from typing import Tuple
 from config import OPTION_LETTERS
 
 
@@ -11,20 +12,21 @@ class OptionHelper:
     """
 
     @staticmethod
-    def get_option_letters(num_options: int) -> List[str]:
+    @lru_cache(maxsize=32)
+    def get_option_letters(num_options: int) -> Tuple[str, ...]:
         """
-        Get list of option letters based on number of options.
+        Get option letters based on number of options (memoized per count).
 
         Args:
             num_options: Number of options
 
         Returns:
-            List of option letters (A, B, C, D, etc.)
+            Tuple of option letters (A, B, C, D, etc.)
         """
         if num_options <= 0 or num_options > len(OPTION_LETTERS):
             raise ValueError(
                 f"Number of options must be between 1 and {len(OPTION_LETTERS)}")
-        return OPTION_LETTERS[:num_options]
+        return tuple(OPTION_LETTERS[:num_options])
 
     @staticmethod
     def validate_answer(answer: str, num_options: int) -> bool:
@@ -9,6 +9,7 @@ import json
 import os
 from io import BytesIO
 from werkzeug.serving import run_simple
+from models.answers import decode_answers
 
 try:
     from utils.excel_exporter import ExcelExporter
@@ -20,17 +21,29 @@ app = Flask(__name__, template_folder='templates', static_folder='static')
 # Database setup
 DATABASE = 'omr_data.db'
 
+# Applied to every connection; journal_mode=WAL is kept in the database file
+# itself, so init_db only has to set it once
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+)
+
 
 def get_db():
     """Get database connection"""
     conn = sqlite3.connect(DATABASE)
     conn.row_factory = sqlite3.Row
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
     return conn
 
 
 def init_db():
     """Initialize the SQLite database"""
-    conn = sqlite3.connect(DATABASE)
+    conn = get_db()
+    # Readers no longer wait on writers, and commits need one fsync
+    conn.execute("PRAGMA journal_mode=WAL")
     c = conn.cursor()
 
     # Create subjects table if it doesn't exist
@@ -89,6 +102,13 @@ def init_db():
     except sqlite3.OperationalError:
         c.execute('ALTER TABLE attempts ADD COLUMN end_time TIMESTAMP')
 
+    # Indexes for the per-student attempt lookup and the per-chapter history,
+    # which is always read newest first
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_attempts_chapter_student_attempt
+                 ON attempts(chapter_id, student_name, attempt_number)''')
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_attempts_chapter
+                 ON attempts(chapter_id, submitted_at DESC)''')
+
     conn.commit()
     conn.close()
 
@@ -157,7 +177,7 @@ def submit_exam():
     if not chapter:
         return jsonify({'success': False, 'message': 'Chapter not found'}), 404
 
-    correct_answers = json.loads(chapter['correct_answers'])
+    correct_answers = decode_answers(chapter['correct_answers'])
 
     # Calculate score
     score = sum(1 for i, ans in enumerate(
@@ -504,7 +524,7 @@ def export_chapter_results():
 
         row = 1
         for attempt in attempts:
-            correct_answers = json.loads(attempt['correct_answers'])
+            correct_answers = decode_answers(attempt['correct_answers'])
             num_questions = attempt['num_questions']
             percentage = (attempt['score'] / num_questions *
                           100) if num_questions > 0 else 0